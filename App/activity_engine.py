@@ -0,0 +1,156 @@
+import os
+import threading
+
+import pandas as pd
+
+from perf import span
+
+# Activity aggregations for the analysis pages. With duckdb installed they
+# run as vectorized, multi-threaded SQL over the activity frame (scanned in
+# place, without copies) or over CSV/Parquet files larger than memory, and
+# only the small result frames come back to pandas. Without duckdb, or with
+# PBI_ACTIVITY_ENGINE=pandas, the same results are computed with pandas.
+# Sources with an "Events" column (the activity store rollup) count each row
+# as that many events. With `hitters` (HeavyHitters over the same events), top
+# artifact and user lists are looked up in the per-day top-K summaries and
+# only aggregated when the summaries cannot prove the answer exact.
+try:
+    import duckdb
+    import pyarrow as pa
+except ImportError:
+    duckdb = None
+
+ACTIVITY_ENGINE = os.environ.get("PBI_ACTIVITY_ENGINE", "duckdb" if duckdb else "pandas")
+ENGINE_THREADS = int(os.environ.get("PBI_ENGINE_THREADS", str(os.cpu_count() or 4)))
+WEEKDAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class ActivityEngine:
+    def __init__(self, source, engine=ACTIVITY_ENGINE, hitters=None):
+        # source: activity DataFrame, or a path / glob of CSV or Parquet files
+        self.source = source
+        self.hitters = hitters
+        self.engine = engine if duckdb else "pandas"
+        self.con = None
+        # Cached engines are shared by sessions; a connection runs one query at a time
+        self.lock = threading.RLock()
+        if self.engine == "duckdb":
+            self.con = duckdb.connect()
+            self.con.execute(f"SET threads = {ENGINE_THREADS}")
+            if isinstance(source, pd.DataFrame):
+                # pandas string columns are Arrow-backed, so this conversion is
+                # zero-copy and DuckDB scans Arrow much faster than pandas objects
+                self.con.register("activity", pa.Table.from_pandas(source, preserve_index=False))
+            else:
+                path = str(source).replace("'", "''")
+                reader = "read_parquet" if path.endswith(".parquet") else "read_csv_auto"
+                self.con.execute(f"CREATE VIEW activity AS SELECT * FROM {reader}('{path}')")
+            columns = [row[0] for row in self.con.execute("DESCRIBE activity").fetchall()]
+        else:
+            if not isinstance(source, pd.DataFrame):
+                self.source = pd.read_parquet(source) if str(source).endswith(".parquet") else pd.read_csv(source)
+                self.source["Activity time"] = pd.to_datetime(self.source["Activity time"], errors="coerce")
+            columns = self.source.columns
+        self.weighted = "Events" in columns
+        self.count = 'sum("Events")::BIGINT' if self.weighted else "count(*)"
+
+    def sql(self, query, params=None):
+        with span("activity_engine"), self.lock:
+            return self.con.execute(query, params or []).df()
+
+    # Events per group, largest first
+    def tally(self, frame, by, sort=True):
+        counts = frame.groupby(by)["Events"].sum() if self.weighted else frame.groupby(by).size()
+        return counts.sort_values(ascending=False, kind="stable") if sort else counts
+
+    def top_artifacts(self, limit=10):
+        if self.con is None:
+            top = self.tally(self.source, "Artifact Name").head(limit).reset_index()
+            top.columns = ["Artifact Name", "Access Count"]
+            return top
+        return self.sql(f"""
+            SELECT "Artifact Name", {self.count} AS "Access Count" FROM activity
+            WHERE "Artifact Name" IS NOT NULL
+            GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT ?
+        """, [limit])
+
+    def users_per_domain(self):
+        if self.con is None:
+            unique_users = self.source.drop_duplicates(subset="User email")
+            counts = unique_users["User email"].str.split("@").str[-1].value_counts().reset_index()
+            counts.columns = ["Email Domain", "Number of Users"]
+            return counts
+        return self.sql("""
+            SELECT split_part("User email", '@', -1) AS "Email Domain", count(DISTINCT "User email") AS "Number of Users"
+            FROM activity WHERE "User email" IS NOT NULL
+            GROUP BY 1 ORDER BY 2 DESC, 1
+        """)
+
+    def weekday_counts(self):
+        if self.con is None:
+            counts = self.tally(self.source, self.source["Activity time"].dt.day_name())
+        else:
+            counts = self.sql(f"""
+                SELECT dayname("Activity time") AS "Weekday", {self.count} AS "Access Count"
+                FROM activity WHERE "Activity time" IS NOT NULL GROUP BY 1
+            """).set_index("Weekday")["Access Count"]
+        counts = counts.reindex(WEEKDAY_ORDER, fill_value=0)
+        return counts.rename_axis("Weekday").reset_index(name="Access Count")
+
+    def monthly_counts(self):
+        if self.con is None:
+            monthly = self.tally(self.source, self.source["Activity time"].dt.to_period("M"), sort=False).reset_index(name="Access Count")
+            monthly.columns = ["YearMonth", "Access Count"]
+            monthly["YearMonth"] = monthly["YearMonth"].dt.to_timestamp()
+            return monthly
+        return self.sql(f"""
+            SELECT date_trunc('month', "Activity time") AS "YearMonth", {self.count} AS "Access Count"
+            FROM activity WHERE "Activity time" IS NOT NULL GROUP BY 1 ORDER BY 1
+        """)
+
+    def access_matrix(self):
+        if self.con is None:
+            return self.tally(self.source, ["User email", "Artifact Name"], sort=False).unstack(fill_value=0)
+        counts = self.sql(f"""
+            SELECT "User email", "Artifact Name", {self.count} AS n FROM activity
+            WHERE "User email" IS NOT NULL AND "Artifact Name" IS NOT NULL GROUP BY 1, 2
+        """)
+        return counts.pivot(index="User email", columns="Artifact Name", values="n").fillna(0).astype(int)
+
+    def top_artifacts_by_id(self, artifact_ids, limit=5):
+        top = self.hitters.top("ArtifactId", limit, items=artifact_ids) if self.hitters is not None else None
+        if top is not None:
+            return top.rename_axis("ArtifactId").reset_index(name="Usage Count")
+        if self.con is None:
+            activity = self.source[self.source["ArtifactId"].isin(artifact_ids)]
+            top = self.tally(activity, "ArtifactId").head(limit).reset_index()
+            top.columns = ["ArtifactId", "Usage Count"]
+            return top
+        ids = pd.Series(list(artifact_ids), dtype="str").dropna().unique()
+        with self.lock:
+            self.con.register("artifact_ids", pa.table({"id": pa.array(ids, type=pa.string())}))
+            return self.sql(f"""
+                SELECT a.ArtifactId, {self.count} AS "Usage Count" FROM activity a
+                SEMI JOIN artifact_ids i ON a.ArtifactId = i.id
+                GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT ?
+            """, [limit])
+
+    def top_users(self, limit=5, since=None):
+        top = self.hitters.top("User email", limit, since=since) if self.hitters is not None else None
+        if top is not None:
+            return top.rename_axis("User Email").reset_index(name="Activity Count")
+        if self.con is None:
+            activity = self.source if since is None else self.source[self.source["Activity time"] >= since]
+            top = self.tally(activity, "User email").head(limit).reset_index()
+            top.columns = ["User Email", "Activity Count"]
+            return top
+        return self.sql(f"""
+            SELECT "User email" AS "User Email", {self.count} AS "Activity Count" FROM activity
+            WHERE "User email" IS NOT NULL AND (?::TIMESTAMP IS NULL OR "Activity time" >= ?::TIMESTAMP)
+            GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT ?
+        """, [since, since, limit])
+
+    def close(self):
+        with self.lock:
+            if self.con is not None:
+                self.con.close()
@@ -0,0 +1,394 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from heavy_hitters import summarize_top
+from distinct_users import sketch_users, HLL_PRECISION
+from last_seen import LastSeen
+from analysis_clock import analysis_end
+from paging import PAGE_ROWS
+
+# Activity logs are ingested in bounded chunks instead of one DataFrame:
+#   <PBI_ACTIVITY_STORE_DIR>/<upload key>/events/part-NNNNN.parquet
+#   <PBI_ACTIVITY_STORE_DIR>/<upload key>/rollup.parquet
+#   <PBI_ACTIVITY_STORE_DIR>/<upload key>/topk.parquet
+#   <PBI_ACTIVITY_STORE_DIR>/<upload key>/users_hll_p<precision>.parquet
+#   <PBI_ACTIVITY_STORE_DIR>/<upload key>/last_seen_{artifacts,pairs}.parquet
+# The rollup has one row per day, user, artifact and activity with its event
+# count and latest time. It carries every column the status and chart code
+# reads, so pages work on it; the raw events are only scanned, with filters
+# pushed into the Parquet reader, for the log views. The other files are
+# per-day summaries derived from the rollup: top artifacts and users (see
+# heavy_hitters.py), distinct-user sketches (see distinct_users.py) and the
+# last-seen tables (see last_seen.py).
+ACTIVITY_STORE_DIR = os.environ.get("PBI_ACTIVITY_STORE_DIR", os.path.join(tempfile.gettempdir(), "pbi_activity_store"))
+ACTIVITY_CHUNK_ROWS = int(os.environ.get("PBI_ACTIVITY_CHUNK_ROWS", "250000"))
+ACTIVITY_STORE_KEEP = int(os.environ.get("PBI_ACTIVITY_STORE_KEEP", "20"))
+# Stores used within this many seconds are kept even beyond the newest KEEP
+ACTIVITY_STORE_IDLE_SECONDS = int(os.environ.get("PBI_ACTIVITY_STORE_IDLE_SECONDS", "3600"))
+ACTIVITY_RESULT_ROWS = int(os.environ.get("PBI_ACTIVITY_RESULT_ROWS", "100000"))
+# Rows read before a paged scan cuts them back to the current page
+PAGE_SCAN_ROWS = 1 << 18
+ACTIVITY_COLUMNS = ["Activity time", "User email", "Activity", "ArtifactId", "Artifact Name"]
+ROLLUP_KEYS = ["Day", "User email", "ArtifactId", "Artifact Name", "Activity"]
+SUMMARIES = {"topk.parquet": summarize_top, f"users_hll_p{HLL_PRECISION}.parquet": sketch_users}
+
+
+def prepare_chunk(chunk):
+    missing = [c for c in ACTIVITY_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Activity file is missing columns: {', '.join(missing)}")
+    chunk["Activity time"] = pd.to_datetime(chunk["Activity time"], errors="coerce")
+    return chunk
+
+
+def read_activity_chunks(source, chunk_rows=ACTIVITY_CHUNK_ROWS):
+    # Text columns are read as strings so every part gets the same schema
+    for chunk in pd.read_csv(source, chunksize=chunk_rows, dtype=str):
+        yield prepare_chunk(chunk)
+
+
+def iter_frame_chunks(df, chunk_rows=ACTIVITY_CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield prepare_chunk(df.iloc[start:start + chunk_rows].copy())
+
+
+def rollup_activity(chunk):
+    return (
+        chunk.assign(Day=chunk["Activity time"].dt.floor("D"))
+        .groupby(ROLLUP_KEYS, dropna=False)
+        .agg(**{"Activity time": ("Activity time", "max"), "Events": ("Activity time", "size")})
+        .reset_index()
+    )
+
+
+def merge_rollups(rollups):
+    return (
+        pd.concat(rollups, ignore_index=True)
+        .groupby(ROLLUP_KEYS, dropna=False)
+        .agg(**{"Activity time": ("Activity time", "max"), "Events": ("Events", "sum")})
+        .reset_index()
+    )
+
+
+def fold_rollup(rollup, chunk):
+    chunk_rollup = rollup_activity(chunk)
+    if rollup is None:
+        return chunk_rollup
+    # Logs are mostly in time order, so only the days a chunk shares with
+    # the rollup so far are grouped again
+    overlap = (rollup["Day"] >= chunk_rollup["Day"].min()) | rollup["Day"].isna()
+    return pd.concat([rollup[~overlap], merge_rollups([rollup[overlap], chunk_rollup])], ignore_index=True)
+
+
+# Daily rollup of an activity CSV without keeping its events
+def rollup_csv(source, chunk_rows=ACTIVITY_CHUNK_ROWS):
+    rollup = None
+    for chunk in read_activity_chunks(source, chunk_rows):
+        rollup = fold_rollup(rollup, chunk)
+    if rollup is None:
+        raise ValueError("Activity file is empty.")
+    return rollup
+
+
+# A per-day summary after an append: only the days from `first_day` on, and
+# the events without a time, are summarized again
+def update_summary(summary, rollup, first_day, summarize):
+    changed = summary["Day"].isna() | (summary["Day"] >= first_day)
+    new_days = rollup["Day"].isna() | (rollup["Day"] >= first_day)
+    return pd.concat([summary[~changed], summarize(rollup[new_days])], ignore_index=True)
+
+
+# Last-seen tables covering every event of a rollup, later ones included
+def last_seen_of(rollup):
+    last_day = rollup["Day"].max()
+    return LastSeen(rollup, as_of=last_day if pd.notna(last_day) else None)
+
+
+def write_last_seen(last_seen, directory):
+    for name, table in (("artifacts", last_seen.artifacts), ("pairs", last_seen.pairs)):
+        path = os.path.join(directory, f"last_seen_{name}.parquet")
+        staging = f"{path}.{os.getpid()}.tmp"
+        table.to_parquet(staging, index=False)
+        os.replace(staging, path)
+
+
+# Sessions touch their store on every run (see ActivityStore.touch), so a
+# store past the newest `keep` is only removed once no session has used it
+# for `idle_seconds`
+def prune_stores(root=ACTIVITY_STORE_DIR, keep=ACTIVITY_STORE_KEEP, idle_seconds=ACTIVITY_STORE_IDLE_SECONDS):
+    stores = []
+    for name in os.listdir(root):
+        if name.startswith("."):
+            continue
+        # Another process may remove a store between listing and reading it
+        try:
+            stores.append((os.path.getmtime(os.path.join(root, name)), name))
+        except FileNotFoundError:
+            pass
+    stores.sort()
+    cutoff = time.time() - idle_seconds
+    for used, name in stores[:-keep] if keep else stores:
+        if used < cutoff:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+# Last-seen tables of a stored log as of an analysis date, read from disk.
+# Worker processes get the store's key instead of the pickled frame.
+def store_last_seen(key, as_of=None, root=ACTIVITY_STORE_DIR):
+    store = ActivityStore(key, root)
+    last_seen = store.last_seen(as_of)
+    if last_seen is None:
+        last_seen = LastSeen(store.rollup(), as_of)
+    return last_seen
+
+
+# Identifies an event across files, so overlapping exports can be appended
+def event_keys(chunk):
+    columns = chunk[ACTIVITY_COLUMNS].assign(**{"Activity time": chunk["Activity time"].dt.as_unit("ns")})
+    return pd.util.hash_pandas_object(columns, index=False).to_numpy()
+
+
+def link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class ActivityStore:
+    def __init__(self, key, root=ACTIVITY_STORE_DIR):
+        self.key = key
+        self.root = root
+        self.path = os.path.join(root, key)
+        self.events_dir = os.path.join(self.path, "events")
+
+    @classmethod
+    def ingest(cls, key, chunks, root=ACTIVITY_STORE_DIR):
+        return cls.build(key, chunks, root)
+
+    # A new store with this store's events plus the events in `chunks` that
+    # it does not have yet. Stores are shared by content key, so appending
+    # never changes this one. Existing parts are linked, the rollup is only
+    # folded with the new events, and duplicates are looked up in the time
+    # window each new chunk covers, so the cost follows the appended volume.
+    def append(self, key, chunks):
+        return self.build(key, chunks, self.root, base=self)
+
+    @classmethod
+    def build(cls, key, chunks, root=ACTIVITY_STORE_DIR, base=None):
+        store = cls(key, root)
+        if store.exists():
+            # The same content was stored before; keep it from being pruned
+            store.touch()
+            return store
+        os.makedirs(root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".ingest-", dir=root)
+        try:
+            events_dir = os.path.join(staging, "events")
+            os.makedirs(events_dir)
+            rollup, rows, parts = None, 0, 0
+            added, duplicates, starts = 0, 0, []
+            if base is not None:
+                for name in sorted(os.listdir(base.events_dir)):
+                    link_or_copy(os.path.join(base.events_dir, name), os.path.join(events_dir, name))
+                meta = base.meta()
+                rollup, rows, parts = base.rollup(), meta["rows"], meta["parts"]
+            for chunk in chunks:
+                if base is not None:
+                    new = ~np.isin(event_keys(chunk), base.window_keys(chunk["Activity time"]))
+                    duplicates += int((~new).sum())
+                    chunk = chunk[new]
+                if chunk.empty:
+                    continue
+                chunk.to_parquet(os.path.join(events_dir, f"part-{parts:05d}.parquet"), index=False)
+                rollup = fold_rollup(rollup, chunk)
+                starts.append(chunk["Activity time"].min())
+                rows += len(chunk)
+                added += len(chunk)
+                parts += 1
+            if rollup is None:
+                raise ValueError("Activity file is empty.")
+            rollup.to_parquet(os.path.join(staging, "rollup.parquet"), index=False)
+            for name, summarize in SUMMARIES.items():
+                if base is None:
+                    summary = summarize(rollup)
+                else:
+                    summary = base.summary(name, summarize)
+                    if added:
+                        summary = update_summary(summary, rollup, pd.Series(starts).min().floor("D"), summarize)
+                summary.to_parquet(os.path.join(staging, name), index=False)
+            # Latest times are maxima, so appended events are merged into the base tables
+            if base is None:
+                last_seen = last_seen_of(rollup)
+            else:
+                last_seen = base.seen_tables()
+                if added:
+                    first_day = pd.Series(starts).min().floor("D")
+                    last_seen = last_seen.merge(last_seen_of(rollup[rollup["Day"].isna() | (rollup["Day"] >= first_day)]))
+            write_last_seen(last_seen, staging)
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump({
+                    "rows": rows, "parts": parts, "rollup_rows": len(rollup), "ingested_at": time.time(),
+                    "added": added, "duplicates": duplicates, "base": base.key if base is not None else None,
+                }, f)
+            try:
+                os.rename(staging, store.path)
+            except OSError:
+                # Another session finished building the same store first
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        prune_stores(root)
+        return store
+
+    # Keys of the stored events between the earliest and latest of `times`
+    def window_keys(self, times):
+        if times.isna().all():
+            return np.empty(0, dtype="uint64")
+        events, _ = self.events(ACTIVITY_COLUMNS, start=times.min(), end=times.max())
+        return event_keys(prepare_chunk(events)) if not events.empty else np.empty(0, dtype="uint64")
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, "meta.json"))
+
+    # Marks the store as in use, so pruning skips it
+    def touch(self):
+        try:
+            os.utime(self.path)
+        except OSError:
+            pass
+
+    def meta(self):
+        with open(os.path.join(self.path, "meta.json")) as f:
+            return json.load(f)
+
+    def rollup(self):
+        return pd.read_parquet(os.path.join(self.path, "rollup.parquet"))
+
+    # A summary of the rollup, written on first use for stores built before
+    # it existed or with another sketch precision
+    def summary(self, name, summarize):
+        path = os.path.join(self.path, name)
+        if not os.path.exists(path):
+            staging = f"{path}.{os.getpid()}.tmp"
+            summarize(self.rollup()).to_parquet(staging, index=False)
+            os.replace(staging, path)
+        return pd.read_parquet(path)
+
+    def top_summary(self):
+        return self.summary("topk.parquet", summarize_top)
+
+    def user_sketch(self):
+        return self.summary(f"users_hll_p{HLL_PRECISION}.parquet", sketch_users)
+
+    # Last-seen tables of every stored event, written on first use for older stores
+    def seen_tables(self):
+        paths = [os.path.join(self.path, f"last_seen_{name}.parquet") for name in ("artifacts", "pairs")]
+        if not all(os.path.exists(path) for path in paths):
+            write_last_seen(last_seen_of(self.rollup()), self.path)
+        return LastSeen.from_tables(*(pd.read_parquet(path) for path in paths))
+
+    # Last-seen tables as of an analysis date. They cover every event, so
+    # they only answer dates on or after the latest one; None otherwise.
+    def last_seen(self, as_of=None):
+        last_seen = self.seen_tables()
+        if last_seen.latest() >= analysis_end(as_of):
+            return None
+        return LastSeen.from_tables(last_seen.artifacts, last_seen.pairs, as_of)
+
+    # Parquet filter for the raw events; `search` is a pattern, or plain text when `literal`.
+    # `until` is an exclusive bound (see analysis_end); events without a time pass it.
+    def event_filter(self, artifact_ids=None, start=None, end=None, search=None, search_columns=None, literal=False,
+                     until=None):
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        conditions = []
+        if artifact_ids is not None:
+            conditions.append(ds.field("ArtifactId").isin([str(i) for i in artifact_ids]))
+        if start is not None:
+            conditions.append(ds.field("Activity time") >= pd.Timestamp(start).to_pydatetime())
+        if end is not None:
+            conditions.append(ds.field("Activity time") <= pd.Timestamp(end).to_pydatetime())
+        if until is not None:
+            activity_time = ds.field("Activity time")
+            conditions.append((activity_time < pd.Timestamp(until).to_pydatetime()) | activity_time.is_null())
+        if search:
+            match = pc.match_substring if literal else pc.match_substring_regex
+            matches = [
+                match(ds.field(c), search, ignore_case=True)
+                for c in search_columns or ["Artifact Name", "User email", "Activity"]
+            ]
+            condition = matches[0]
+            for other in matches[1:]:
+                condition = condition | other
+            conditions.append(condition)
+        predicate = None
+        for condition in conditions:
+            predicate = condition if predicate is None else predicate & condition
+        return predicate
+
+    # Raw events matching the filters, at most `limit` rows, and the number of matches
+    def events(self, columns=None, artifact_ids=None, start=None, end=None, search=None, search_columns=None, limit=None,
+               until=None):
+        import pyarrow.dataset as ds
+
+        if not self.exists():
+            return pd.DataFrame(columns=columns), 0
+        predicate = self.event_filter(artifact_ids, start, end, search, search_columns, until=until)
+        dataset = ds.dataset(self.events_dir, format="parquet")
+        if limit is None:
+            table = dataset.to_table(columns=columns, filter=predicate)
+            return table.to_pandas(), table.num_rows
+        total = dataset.count_rows(filter=predicate)
+        if total > limit:
+            table = dataset.head(limit, columns=columns, filter=predicate)
+        else:
+            table = dataset.to_table(columns=columns, filter=predicate)
+        return table.to_pandas(), total
+
+    # One page of the raw events, sorted and filtered in the scan (a page
+    # source, see paging.py). Batches are reduced to the rows up to the end
+    # of the page as they are read, so memory follows the page position
+    # rather than the size of the log. Ties are broken by the other columns,
+    # so consecutive pages neither repeat nor skip rows.
+    def page(self, columns, sort=None, descending=False, search=None, offset=0, rows=PAGE_ROWS, artifact_ids=None,
+             until=None):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        if not self.exists():
+            return pd.DataFrame(columns=columns), 0
+        predicate = self.event_filter(artifact_ids, search=search, search_columns=[
+            c for c in columns if c in ("Artifact Name", "User email", "Activity")
+        ], literal=True, until=until)
+        dataset = ds.dataset(self.events_dir, format="parquet")
+        total = dataset.count_rows(filter=predicate)
+        sort = sort or columns[0]
+        keys = [(sort, "descending" if descending else "ascending")] + [(c, "ascending") for c in columns if c != sort]
+        k = offset + rows
+        kept, pending, pending_rows = None, [], 0
+
+        def reduce(tables):
+            table = pa.concat_tables(tables)
+            return table.take(pc.select_k_unstable(table, k=min(k, table.num_rows), sort_keys=keys))
+
+        for batch in dataset.to_batches(columns=columns, filter=predicate):
+            pending.append(pa.Table.from_batches([batch]))
+            pending_rows += batch.num_rows
+            if pending_rows >= max(4 * k, PAGE_SCAN_ROWS):
+                kept = reduce(([kept] if kept is not None else []) + pending)
+                pending, pending_rows = [], 0
+        tables = ([kept] if kept is not None else []) + pending
+        if not tables:
+            return pd.DataFrame(columns=columns), total
+        table = reduce(tables).sort_by(keys).slice(offset, rows)
+        return table.to_pandas(), total
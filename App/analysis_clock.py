@@ -0,0 +1,18 @@
+import pandas as pd
+
+# Every derived result is computed as of a calendar day instead of the wall
+# clock, so results stay the same for the whole day and can be cached with
+# the date in their key, and past dates can be analysed as well.
+def analysis_date(as_of=None):
+    return pd.Timestamp(as_of if as_of is not None else pd.Timestamp.now()).normalize()
+
+
+# Exclusive upper bound of the events that count on the analysis date
+def analysis_end(as_of=None):
+    return analysis_date(as_of) + pd.Timedelta(days=1)
+
+
+# Activity up to the end of the analysis date; events without a time are kept
+def activity_until(activity_df, as_of=None):
+    later = pd.to_datetime(activity_df["Activity time"], errors="coerce") >= analysis_end(as_of)
+    return activity_df[~later] if later.any() else activity_df
@@ -0,0 +1,177 @@
+import argparse
+import ipaddress
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import Client, Listener
+
+from session_store import SessionDataStore, MEMORY_BUDGET_MB
+from perf import export_prometheus, is_admin
+from workspace_cache import WorkspaceCache, WorkspaceFetchError
+from last_seen import LastSeen, DEFAULT_ACTIVITY_WINDOW
+from activity_store import ActivityStore, store_last_seen
+
+# Multi-user deployment: one data service process owns the inventory and
+# activity stores, and every Streamlit server queries it over a local socket.
+# CPU-heavy work runs in a pool of worker processes instead of the Streamlit
+# script threads. Requests are pickled, so anyone holding the key can run
+# code in the service: PBI_DATA_SERVICE_KEY is required, and the service
+# must listen on loopback or a private network only.
+SERVICE_ADDRESS = os.environ.get("PBI_DATA_SERVICE", "")
+SERVICE_AUTHKEY = os.environ.get("PBI_DATA_SERVICE_KEY", "")
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def is_loopback(host):
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+class DataService:
+    def __init__(self, workers=None):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.activity_store = SessionDataStore(int(MEMORY_BUDGET_MB * 1024 * 1024))
+        self.inventory = WorkspaceCache()
+        self.lock = threading.Lock()
+        self.last_seen = {}
+
+    def handle(self, op, kwargs):
+        handler = getattr(self, f"op_{op}", None)
+        if handler is None:
+            raise ValueError(f"Unknown data service operation: {op}")
+        return handler(**kwargs)
+
+    def op_ping(self):
+        return "pong"
+
+    # None when the workspace's API calls failed
+    def op_inventory(self, token, workspace_id, user_email, as_of=None):
+        from utils import get_filtered_dataframes
+        try:
+            return self.inventory.get_or_fetch(token, workspace_id, user_email, get_filtered_dataframes, as_of=as_of)
+        except WorkspaceFetchError:
+            return None
+
+    # The cache is shared by every user, so its statistics and purge are for admins only
+    def op_cache_usage(self, user_email=None):
+        if not is_admin(user_email):
+            raise PermissionError("Workspace cache statistics are limited to PBI_ADMIN_EMAILS.")
+        return self.inventory.usage()
+
+    def op_cache_purge(self, workspace_id=None, user_email=None):
+        if not is_admin(user_email):
+            raise PermissionError("Purging the workspace cache is limited to PBI_ADMIN_EMAILS.")
+        return self.inventory.purge(workspace_id)
+
+    def op_has_activity(self, session_id, key):
+        return self.activity_store.attach(session_id, "activity_df", key)
+
+    def op_put_activity(self, session_id, key, df):
+        return self.activity_store.put(session_id, "activity_df", df, key=key)
+
+    def op_release(self, session_id):
+        self.activity_store.release(session_id)
+
+    def op_activity_status(self, session_id, reports_df, datasets_df, users_df, key=None, window=DEFAULT_ACTIVITY_WINDOW, as_of=None):
+        from utils import apply_activity_status
+        activity_df = self.activity_store.get(session_id, "activity_df")
+        if activity_df is None:
+            raise KeyError("No activity data stored for this session")
+        # The pass over the activity log runs once per log and analysis date,
+        # in a worker; statuses for each window and workspace set are
+        # cheap lookups. Stored logs already hold their last-seen tables, so
+        # the worker reads them from disk by key instead of receiving the frame.
+        with self.lock:
+            last_seen = self.last_seen.get((key, as_of))
+        if last_seen is None:
+            if key is not None and ActivityStore(key).exists():
+                last_seen = self.pool.submit(store_last_seen, key, as_of).result()
+            else:
+                last_seen = self.pool.submit(LastSeen, activity_df, as_of).result()
+            stored = self.activity_store.keys()
+            with self.lock:
+                self.last_seen = {k: v for k, v in self.last_seen.items() if k[0] in stored}
+                if key is not None:
+                    self.last_seen[(key, as_of)] = last_seen
+        # The filtered activity frame is not sent back over the socket
+        _, reports_df, datasets_df, users_df, latest_access = apply_activity_status(
+            activity_df, reports_df, datasets_df, users_df, window=window, last_seen=last_seen, as_of=as_of
+        )
+        return reports_df, datasets_df, users_df, latest_access
+
+    def op_usage(self):
+        return self.activity_store.usage()
+
+    # Spans recorded in this process (inventory fetches) in Prometheus text format
+    def op_metrics(self):
+        return export_prometheus()
+
+    def serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    op, kwargs = conn.recv()
+                except EOFError:
+                    return
+                try:
+                    conn.send((True, self.handle(op, kwargs)))
+                except Exception as e:
+                    conn.send((False, f"{type(e).__name__}: {e}"))
+
+    def serve_forever(self, address, authkey):
+        with Listener(address, authkey=authkey) as listener:
+            print(f"Data service listening on {address[0]}:{address[1]}")
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=self.serve_connection, args=(conn,), daemon=True).start()
+
+
+class DataServiceClient:
+    def __init__(self, address, authkey=SERVICE_AUTHKEY):
+        if not authkey:
+            raise RuntimeError("Set PBI_DATA_SERVICE_KEY to the data service's secret to use PBI_DATA_SERVICE.")
+        self.address = parse_address(address)
+        self.authkey = authkey.encode()
+        self.local = threading.local()
+
+    def call(self, op, **kwargs):
+        # One connection per Streamlit script thread, reopened if the service restarted
+        for attempt in range(2):
+            conn = getattr(self.local, "conn", None)
+            try:
+                if conn is None:
+                    conn = self.local.conn = Client(self.address, authkey=self.authkey)
+                conn.send((op, kwargs))
+                ok, result = conn.recv()
+                break
+            except (EOFError, OSError):
+                self.local.conn = None
+                if attempt:
+                    raise
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared inventory and activity data service.")
+    parser.add_argument("--address", default=SERVICE_ADDRESS or "127.0.0.1:8765", help="host:port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    if not SERVICE_AUTHKEY:
+        sys.exit("Set PBI_DATA_SERVICE_KEY to a random secret shared with the Streamlit servers.")
+    address = parse_address(args.address)
+    if not is_loopback(address[0]):
+        print(f"Warning: listening on {address[0]}; keep the service on loopback or a private network.", file=sys.stderr)
+    DataService(workers=args.workers).serve_forever(address, SERVICE_AUTHKEY.encode())
+
+
+if __name__ == "__main__":
+    main()
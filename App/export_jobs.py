@@ -0,0 +1,90 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from exports import EXPORT_DIR, EXPORT_KEEP, available_formats, prune_exports, write_excel, write_parquet
+
+# Background export jobs: a job builds a bundle of tables in a worker
+# thread, reports its progress and leaves the file on disk under
+# PBI_EXPORT_DIR, so large exports neither block a page run nor stay in
+# session memory. Sessions only keep the job id. At most
+# PBI_EXPORT_JOB_WORKERS jobs run at once; the rest wait in a queue.
+EXPORT_JOB_WORKERS = int(os.environ.get("PBI_EXPORT_JOB_WORKERS", "2"))
+BUNDLE_FORMATS = {
+    "Parquet (zip)": (".zip", "application/zip"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+# Bundle formats that can be written here: Excel needs openpyxl or xlsxwriter
+def bundle_formats():
+    return [fmt for fmt in BUNDLE_FORMATS if fmt != "Excel" or "Excel" in available_formats()]
+
+
+# One Parquet file per table in a zip, or one sheet per table in a workbook
+def write_bundle(tables, path, fmt):
+    staging = f"{path}.{os.getpid()}.tmp"
+    if fmt == "Excel":
+        write_excel({name[:31]: df for name, df in tables.items()}, staging)
+    else:
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(path)) as tmp, \
+                zipfile.ZipFile(staging, "w", zipfile.ZIP_STORED) as bundle:
+            # Parquet pages are already compressed
+            for name, df in tables.items():
+                part = os.path.join(tmp, f"{name}.parquet")
+                write_parquet(df, part)
+                bundle.write(part, f"{name}.parquet")
+    os.replace(staging, path)
+
+
+class ExportJobs:
+    def __init__(self, workers=EXPORT_JOB_WORKERS, root=EXPORT_DIR, keep=EXPORT_KEEP):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export-job")
+        self.root = root
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    # build(report) returns the tables (name -> frame); it may call
+    # report(fraction, message) to publish its progress
+    def submit(self, build, fmt, file_stem):
+        job_id = uuid.uuid4().hex[:12]
+        extension, mime = BUNDLE_FORMATS[fmt]
+        job = {
+            "id": job_id, "status": "queued", "progress": 0.0, "message": "Waiting for a worker",
+            "file_name": f"{file_stem}{extension}", "mime": mime, "path": None, "error": None,
+            "submitted": time.time(), "finished": None,
+        }
+        with self.lock:
+            self.jobs[job_id] = job
+            for old in sorted(self.jobs, key=lambda k: self.jobs[k]["submitted"])[:-self.keep]:
+                if self.jobs[old]["finished"] is not None:
+                    del self.jobs[old]
+        self.pool.submit(self._run, job, build, fmt)
+        return job_id
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def _update(self, job, **fields):
+        with self.lock:
+            job.update(fields)
+
+    def _run(self, job, build, fmt):
+        self._update(job, status="running", message="Starting")
+        try:
+            tables = build(lambda fraction, message: self._update(job, progress=min(fraction, 1.0), message=message))
+            self._update(job, progress=0.9, message=f"Writing {len(tables)} tables")
+            os.makedirs(self.root, exist_ok=True)
+            path = os.path.join(self.root, f"bundle_{job['id']}{BUNDLE_FORMATS[fmt][0]}")
+            write_bundle(tables, path, fmt)
+            prune_exports(self.root, self.keep)
+            self._update(job, status="done", progress=1.0, message="Ready", path=path, finished=time.time())
+        except Exception as e:
+            self._update(job, status="failed", error=f"{type(e).__name__}: {e}", finished=time.time())
@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import importlib.util
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+from perf import span
+from session_store import frame_key
+from snapshot_store import flatten_nested
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Deferred downloads: pages hand download buttons a callable, so a file is
+# only written when a user clicks. Files are written PBI_EXPORT_CHUNK_ROWS
+# rows at a time to PBI_EXPORT_DIR and named by a hash of the filters that
+# produced the rows and the format, so repeated clicks, reruns and other
+# sessions with the same filters reuse the file. The PBI_EXPORT_KEEP most
+# recently used files are kept.
+#   <PBI_EXPORT_DIR>/<filter hash>.<ext>
+EXPORT_DIR = os.environ.get("PBI_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "pbi_governance_exports"))
+EXPORT_CHUNK_ROWS = int(os.environ.get("PBI_EXPORT_CHUNK_ROWS", "100000"))
+EXPORT_KEEP = int(os.environ.get("PBI_EXPORT_KEEP", "50"))
+EXCEL_MAX_ROWS = 1048575
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+_lock = threading.Lock()
+_writing = {}
+
+
+# Formats that can be written here: Parquet needs pyarrow, Excel needs
+# openpyxl or xlsxwriter and stops at a sheet's row limit
+def available_formats(rows=0):
+    formats = ["CSV", "CSV (gzip)"]
+    if pq is not None:
+        formats.append("Parquet")
+    if rows <= EXCEL_MAX_ROWS and any(importlib.util.find_spec(m) for m in ("xlsxwriter", "openpyxl")):
+        formats.append("Excel")
+    return formats
+
+
+def export_path(filters, fmt, root=EXPORT_DIR):
+    digest = hashlib.sha1(repr((filters, fmt)).encode()).hexdigest()[:20]
+    return os.path.join(root, digest + EXPORT_FORMATS[fmt][0])
+
+
+# Content hash of a frame, for exports whose filters are the rows themselves
+def rows_key(df):
+    return frame_key(flatten_nested(df))
+
+
+# Filters of an export identified by its rows. The hash is only taken when
+# the file is requested, not on every page run.
+def rows_filters(name, df):
+    return lambda: (name, rows_key(df))
+
+
+def chunks(df, rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, max(len(df), 1), rows):
+        yield df.iloc[start:start + rows]
+
+
+def write_csv(df, f):
+    for i, chunk in enumerate(chunks(df)):
+        f.write(chunk.to_csv(index=False, header=i == 0).encode("utf-8"))
+
+
+def write_parquet(df, path):
+    df = flatten_nested(df)
+    # The schema comes from the whole frame, so a chunk of missing values keeps the column type
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+# One sheet per frame of `sheets` (sheet name -> frame)
+def write_excel(sheets, path):
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            row = 0
+            for i, chunk in enumerate(chunks(flatten_nested(df))):
+                chunk.to_excel(writer, sheet_name=name, index=False, header=i == 0, startrow=row)
+                row += len(chunk) + (i == 0)
+
+
+def write_export(df, path, fmt):
+    staging = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if fmt == "CSV":
+        with open(staging, "wb") as f:
+            write_csv(df, f)
+    elif fmt == "CSV (gzip)":
+        with gzip.open(staging, "wb", compresslevel=6) as f:
+            write_csv(df, f)
+    elif fmt == "Parquet":
+        write_parquet(df, staging)
+    else:
+        write_excel({"Sheet1": df}, staging)
+    os.replace(staging, path)
+
+
+# Other sessions and processes prune the same directory, so files may
+# disappear at any point here
+def prune_exports(root=EXPORT_DIR, keep=EXPORT_KEEP):
+    files = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name.endswith(".tmp") or not os.path.isfile(path):
+            continue
+        try:
+            files.append((os.path.getmtime(path), name))
+        except FileNotFoundError:
+            pass
+    files.sort()
+    for _, name in files[:-keep] if keep else files:
+        try:
+            os.remove(os.path.join(root, name))
+        except FileNotFoundError:
+            pass
+
+
+# Path of the export of `df` for these filters, written on first request.
+# `df` may be a callable returning the frame, so it is only built on a miss;
+# `filters` may be a callable too. Concurrent requests for the same file
+# wait for a single write.
+def export_file(df, filters, fmt, root=EXPORT_DIR):
+    path = export_path(filters() if callable(filters) else filters, fmt, root)
+    with _lock:
+        write_lock = _writing.setdefault(path, threading.Lock())
+    try:
+        with write_lock:
+            if os.path.exists(path):
+                os.utime(path)
+                return path
+            os.makedirs(root, exist_ok=True)
+            with span("export"):
+                write_export(df() if callable(df) else df, path, fmt)
+            prune_exports(root)
+    finally:
+        # Write locks live while a request holds them
+        with _lock:
+            if _writing.get(path) is write_lock and not write_lock.locked():
+                del _writing[path]
+    return path
+
+
+# Contents of the export for these filters. Another write may prune the file
+# between export_file and the read; it is then written again.
+def export_bytes(df, filters, fmt, root=EXPORT_DIR):
+    filters = filters() if callable(filters) else filters
+    for attempt in range(2):
+        path = export_file(df, filters, fmt, root)
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            if attempt:
+                raise
@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from utils import POWERBI_API_BASE, call_powerbi_api, get_filtered_dataframes
+from utils import apply_activity_status, find_unused_artifacts
+from snapshot_store import SNAPSHOT_DIR, flatten_nested, write_snapshot
+from activity_store import rollup_csv
+from last_seen import DEFAULT_ACTIVITY_WINDOW
+from analysis_clock import analysis_date
+
+# Headless governance run for cron: fetches every workspace, annotates the
+# inventory exactly like the pages do and writes the results as files.
+#   POWERBI_ACCESS_TOKEN=... python governance_report.py --email me@corp.com --activity activity.csv --out reports
+TOKEN_ENV = "POWERBI_ACCESS_TOKEN"
+OUTPUT_FORMATS = ("parquet", "csv")
+
+
+def fetch_workspace(token, workspace, user_email, as_of=None, fetch=get_filtered_dataframes):
+    try:
+        reports, datasets, users = fetch(token, workspace["id"], user_email, as_of)
+    except Exception as e:
+        return workspace, None, f"{type(e).__name__}: {e}"
+    for df in (reports, datasets, users):
+        df["workspace_id"] = workspace["id"]
+        df["workspace_name"] = workspace["name"]
+    return workspace, (reports, datasets, users), None
+
+
+def print_progress(done, total, failed):
+    if done % 100 == 0 or done == total:
+        print(f"Fetched {done:,}/{total:,} workspaces ({failed:,} failed)", flush=True)
+
+
+# fetch: loads one workspace, like get_filtered_dataframes; progress is
+# called with (done, total, failed) after each workspace
+def fetch_inventory(token, workspaces, user_email, concurrency, as_of=None, fetch=get_filtered_dataframes,
+                    progress=print_progress):
+    frames, failed = [], []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i, (workspace, result, error) in enumerate(
+            pool.map(lambda ws: fetch_workspace(token, ws, user_email, as_of, fetch), workspaces), 1
+        ):
+            if error:
+                failed.append({"workspace_id": workspace["id"], "workspace_name": workspace["name"], "error": error})
+            else:
+                frames.append(result)
+            progress(i, len(workspaces), len(failed))
+    if not frames:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), failed
+    reports, datasets, users = (pd.concat(dfs, ignore_index=True) for dfs in zip(*frames))
+    return reports, datasets, users, failed
+
+
+# The log is folded into a daily rollup chunk by chunk, so it never has to fit in memory
+def load_activity(path):
+    return rollup_csv(path)
+
+
+def build_outputs(reports_df, datasets_df, users_df, activity_df=None, window=DEFAULT_ACTIVITY_WINDOW, as_of=None,
+                  last_seen=None):
+    outputs = {
+        "reports": reports_df,
+        "datasets": datasets_df,
+        "stale_reports": reports_df[reports_df["Reportstatus Based on Dataset"] != "Up to Date"],
+        "stale_datasets": datasets_df[datasets_df["Dataset Freshness Status"] != "Up to Date"],
+    }
+    if activity_df is not None:
+        activity_df, reports_df, datasets_df, users_df, _ = apply_activity_status(
+            activity_df, reports_df, datasets_df, users_df, window=window, last_seen=last_seen, as_of=as_of
+        )
+        outputs.update({
+            "reports": reports_df,
+            "datasets": datasets_df,
+            "stale_reports": reports_df[
+                (reports_df["Reportstatus Based on Dataset"] != "Up to Date") | (reports_df["Activity Status"] == "Inactive")
+            ],
+            "stale_datasets": datasets_df[
+                (datasets_df["Dataset Freshness Status"] != "Up to Date") | (datasets_df["Activity Status"] == "Inactive")
+            ],
+            "inactive_users": users_df[users_df["activityStatus"] == "Inactive"],
+            "unused_artifacts": find_unused_artifacts(activity_df, reports_df, datasets_df),
+        })
+    outputs["users"] = users_df
+    return outputs
+
+
+def write_outputs(outputs, out_dir, fmt):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, df in outputs.items():
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        if fmt == "parquet":
+            flatten_nested(df).to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute governance outputs for all workspaces without Streamlit.")
+    parser.add_argument("--email", required=True, help="email of the account the token belongs to")
+    parser.add_argument("--activity", help="activity CSV export; enables inactive users and unused artifacts")
+    parser.add_argument("--activity-days", type=int, default=DEFAULT_ACTIVITY_WINDOW,
+                        help="users and artifacts accessed within this many days count as active")
+    parser.add_argument("--as-of", type=pd.Timestamp, help="analysis date YYYY-MM-DD (default: today); later activity is ignored")
+    parser.add_argument("--workspaces", help="comma-separated workspace IDs (default: every workspace the token can see)")
+    parser.add_argument("--out", default="governance_output", help="output directory; each run writes a dated subfolder")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="parquet")
+    parser.add_argument("--snapshot", action="store_true", help="also record the annotated inventory in the snapshot store, dated --as-of")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--concurrency", type=int, default=8, help="workspaces fetched in parallel")
+    args = parser.parse_args()
+
+    token = os.environ.get(TOKEN_ENV)
+    if not token:
+        sys.exit(f"Set {TOKEN_ENV} to a Power BI access token.")
+
+    started = time.time()
+    as_of = analysis_date(args.as_of)
+    groups = call_powerbi_api(f"{POWERBI_API_BASE}/groups", token, show_error=False)
+    if groups is None:
+        sys.exit("Could not list workspaces; check the token and POWERBI_API_BASE.")
+    workspaces = groups.get("value", [])
+    if args.workspaces:
+        wanted = set(args.workspaces.split(","))
+        workspaces = [ws for ws in workspaces if ws["id"] in wanted]
+
+    reports_df, datasets_df, users_df, failed = fetch_inventory(token, workspaces, args.email, args.concurrency, as_of)
+    if reports_df.empty:
+        sys.exit("No workspace data could be fetched.")
+    activity_df = load_activity(args.activity) if args.activity else None
+    outputs = build_outputs(reports_df, datasets_df, users_df, activity_df, args.activity_days, as_of)
+
+    out_dir = os.path.join(args.out, f"{as_of:%Y-%m-%d}")
+    write_outputs(outputs, out_dir, args.format)
+    summary = {
+        "run_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seconds": round(time.time() - started, 1),
+        "workspaces": len(workspaces),
+        "failed_workspaces": failed,
+        "activity_file": args.activity,
+        "activity_days": args.activity_days,
+        "as_of": f"{as_of:%Y-%m-%d}",
+        "rows": {name: len(df) for name, df in outputs.items()},
+    }
+    if args.snapshot:
+        summary["snapshot_date"] = write_snapshot(
+            {table: outputs[table] for table in ("reports", "datasets", "users")},
+            snapshot_date=f"{as_of:%Y-%m-%d}", root=args.snapshot_dir
+        )
+    with open(os.path.join(out_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Wrote {', '.join(f'{n} ({r:,})' for n, r in summary['rows'].items())} to {out_dir}")
+    # A non-zero exit lets cron report partially failed runs
+    if failed:
+        print(f"{len(failed):,} workspaces failed, see summary.json", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
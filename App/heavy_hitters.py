@@ -0,0 +1,77 @@
+import os
+
+import pandas as pd
+
+from analysis_clock import analysis_end
+
+# Per-day top-K summaries of the activity log, built when events are
+# ingested, so the top artifact and top user lists are lookups in a small
+# table instead of aggregations over the events. Each day keeps its
+# PBI_ACTIVITY_TOPK busiest artifacts and users with their exact counts, plus
+# a bound: the largest count it dropped. Summed over a date range, the
+# bounds limit how far any count can be off, so a lookup knows whether its
+# top K is exact; when it is not, it returns None and the caller aggregates.
+# Summaries are mergeable: appended events only rebuild the days they touch.
+ACTIVITY_TOPK = int(os.environ.get("PBI_ACTIVITY_TOPK", "1000"))
+TOPK_DIMENSIONS = ["ArtifactId", "User email"]
+TOPK_COLUMNS = ["Day", "Dimension", "Item", "Count", "Bound"]
+
+
+def summarize_top(rollup, capacity=ACTIVITY_TOPK):
+    frames = []
+    for dimension in TOPK_DIMENSIONS:
+        counts = (
+            rollup.groupby(["Day", dimension], dropna=False)["Events"].sum()
+            .reset_index()
+            .rename(columns={dimension: "Item", "Events": "Count"})
+        )
+        counts = counts[counts["Item"].notna()]
+        counts = counts.sort_values(["Day", "Count", "Item"], ascending=[True, False, True])
+        rank = counts.groupby("Day", dropna=False).cumcount()
+        bounds = counts.loc[rank == capacity, ["Day", "Count"]].rename(columns={"Count": "Bound"})
+        kept = counts[rank < capacity].merge(bounds, on="Day", how="left")
+        kept["Bound"] = kept["Bound"].fillna(0).astype("int64")
+        frames.append(kept.assign(Dimension=dimension))
+    return pd.concat(frames, ignore_index=True)[TOPK_COLUMNS]
+
+
+# Counts per item over summary rows, largest first, with the sum of the
+# bounds of the days each item was kept on, and the bound for all days
+def total_counts(rows):
+    unseen = int(rows.drop_duplicates("Day")["Bound"].sum())
+    counts = rows.groupby("Item").agg(Count=("Count", "sum"), Seen=("Bound", "sum"))
+    return counts.reset_index().sort_values(["Count", "Item"], ascending=[False, True]), unseen
+
+
+class HeavyHitters:
+    # until: analysis date; days after it are left out. Totals over all
+    # days are computed once, so lookups without `since` only filter them.
+    def __init__(self, summary, until=None):
+        if until is not None:
+            summary = summary[~(summary["Day"] >= analysis_end(until))]
+        self.days = {dimension: summary[summary["Dimension"] == dimension] for dimension in TOPK_DIMENSIONS}
+        self.totals = {dimension: total_counts(rows) for dimension, rows in self.days.items()}
+
+    # The `limit` largest items of a dimension, optionally among `items` and
+    # from `since` on, as counts indexed by item; None when not provably exact
+    def top(self, dimension, limit, items=None, since=None):
+        if since is None:
+            counts, unseen = self.totals[dimension]
+        else:
+            since = pd.Timestamp(since)
+            # Day buckets cannot split a day
+            if since != since.normalize():
+                return None
+            rows = self.days[dimension]
+            counts, unseen = total_counts(rows[rows["Day"] >= since])
+        if items is not None:
+            counts = counts[counts["Item"].isin(items)]
+        top, rest = counts.iloc[:limit], counts.iloc[limit:]
+        if unseen:
+            # Items left out of some days may be undercounted by the bounds of those days
+            if len(top) < limit or (top["Seen"] < unseen).any():
+                return None
+            lowest = top["Count"].iloc[-1]
+            if lowest <= unseen or ((rest["Count"] + unseen - rest["Seen"] >= lowest) & (rest["Seen"] < unseen)).any():
+                return None
+        return top.set_index("Item")["Count"]
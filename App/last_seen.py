@@ -0,0 +1,74 @@
+import pandas as pd
+
+from analysis_clock import analysis_date, activity_until
+
+# Activity windows offered on the pages, in days before the analysis date
+ACTIVITY_WINDOWS = {"30 days": 30, "90 days": 90, "180 days": 180, "365 days": 365}
+DEFAULT_ACTIVITY_WINDOW = 90
+
+
+# Start of an activity window: a number of days back, or an explicit date
+def window_start(window=DEFAULT_ACTIVITY_WINDOW, as_of=None):
+    if isinstance(window, (int, float)):
+        return analysis_date(as_of) - pd.Timedelta(days=window)
+    return pd.Timestamp(window)
+
+
+def status_since(latest, start):
+    return (pd.to_datetime(latest) >= start).map({True: "Active", False: "Inactive"})
+
+
+LATEST_COLUMNS = ["ArtifactId", "Artifact Name", "User email", "Activity", "Activity time"]
+
+
+# The latest row per artifact, found with a hash group-by max instead of a
+# sort of the whole log. Artifacts that only have events without a time keep
+# their last such event; ties keep the last row.
+def latest_per_artifact(activity_df):
+    latest = activity_df.groupby("ArtifactId")["Activity time"].transform("max")
+    rows = activity_df[(activity_df["Activity time"] == latest) | latest.isna()]
+    return rows.drop_duplicates(subset="ArtifactId", keep="last")[LATEST_COLUMNS].reset_index(drop=True)
+
+
+# Last-seen times computed once per activity log: the latest event per
+# artifact and the latest time per user and artifact. Statuses for any
+# window, and for any set of workspaces, are then vectorized lookups on
+# these small tables instead of new passes over the events. Events after the
+# analysis date `as_of` are ignored. Both tables are maxima, so the tables of
+# two logs merge into those of their union; the activity store keeps them
+# up to date as events are appended.
+class LastSeen:
+    def __init__(self, activity_df, as_of=None):
+        self.as_of = analysis_date(as_of)
+        activity_df = activity_until(activity_df.dropna(subset=["ArtifactId"]), self.as_of)
+        self.artifacts = latest_per_artifact(activity_df)
+        self.pairs = activity_df.groupby(["User email", "ArtifactId"])["Activity time"].max().reset_index()
+
+    @classmethod
+    def from_tables(cls, artifacts, pairs, as_of=None):
+        last_seen = cls.__new__(cls)
+        last_seen.as_of = analysis_date(as_of)
+        last_seen.artifacts = artifacts
+        last_seen.pairs = pairs
+        return last_seen
+
+    # Last-seen tables over this log and `other`, whose rows win ties
+    def merge(self, other):
+        artifacts = latest_per_artifact(pd.concat([self.artifacts, other.artifacts], ignore_index=True))
+        pairs = (
+            pd.concat([self.pairs, other.pairs], ignore_index=True)
+            .groupby(["User email", "ArtifactId"])["Activity time"].max()
+            .reset_index()
+        )
+        return LastSeen.from_tables(artifacts, pairs, max(self.as_of, other.as_of))
+
+    # Time of the latest event covered, NaT when there is none
+    def latest(self):
+        return self.pairs["Activity time"].max()
+
+    # Latest event per artifact and latest time per user, for these artifacts only
+    def for_artifacts(self, artifact_ids):
+        artifact_ids = list(artifact_ids)
+        artifacts = self.artifacts[self.artifacts["ArtifactId"].isin(artifact_ids)]
+        pairs = self.pairs[self.pairs["ArtifactId"].isin(artifact_ids)]
+        return artifacts, pairs.groupby("User email")["Activity time"].max()
@@ -1,18 +1,11 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
-import plotly.express as px
-import seaborn as sns
-from utils import get_filtered_dataframes, apply_sidebar_style, show_workspace
+from utils import get_filtered_dataframes, init_page, show_logo, show_workspace
 from utils import  render_profile_header, add_logout_button
-from utils import get_cached_workspace_data
-apply_sidebar_style()
-def inject_external_style():
-    with open("static/style.css") as f:
-        css = f.read()
-        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
-inject_external_style()
+from utils import get_cached_workspace_data, plot_bar, plot_pie
+from utils import summarize_names, show_name_drilldown
+from utils import select_export_format, export_button, rows_filters
+init_page()
 
 if not (st.session_state.get("access_token") and
         st.session_state.get("user_email")):
@@ -26,9 +19,7 @@ show_workspace()
 if st.session_state.get("logged_out"):
     st.session_state.pop("logged_out")
     st.switch_page("Home.py")  
-col1, col2, col3 = st.columns(3)
-with col2:
-    st.image("./images/dover_log.png")
+show_logo()
 
 st.markdown("<h1 style='text-align: center;'>📊 Reports</h1>", unsafe_allow_html=True)
 
@@ -112,13 +103,11 @@ with col1:
           <li><span style="color:#F44336;"><b>Expired</b></span> – Non-refreshable datasets.</li>
           <li><span style="color:#a6a6a6;"><b>Unknown</b></span> – Unclassified or missing status.</li>
         </ul>
-        Hover over segments to see report names per category.
+        Hover over segments to see a sample of report names per category; use the drill-down below the chart for the full list.
         </div>
         """, unsafe_allow_html=True)
 
-    report_data = reports_df.groupby(["workspace_name", "Reportstatus Based on Dataset"])["name"].agg(list).reset_index()
-    report_data["Count"] = report_data["name"].apply(len)
-    report_data["Report Names"] = report_data["name"].apply(lambda x: "<br>".join(x))
+    report_data = summarize_names(reports_df, ["workspace_name", "Reportstatus Based on Dataset"], label="Report Names")
     report_status_colors = {
         "Up to Date": "#87CEEB",          
         "Needs Attention": "#E2C312",          
@@ -126,39 +115,26 @@ with col1:
         "Unknown": "#a6a6a6",          
     }
 
-    # Plotly stacked bar chart
-    fig = px.bar(
+    # Stacked bar chart
+    plot_bar(
         report_data,
         x="workspace_name",
         y="Count",
         color="Reportstatus Based on Dataset",
+        color_map=report_status_colors,
+        tickangle=-45,
         text="Count",
-        color_discrete_map=report_status_colors,
-        hover_data={"Report Names": True, "Count": True, "workspace_name": False, "name": False},
+        hover_data={"Report Names": True, "Count": True, "workspace_name": False},
         labels={"workspace_name": "Workspace", "Count": "Number of Reports"},
+        barmode="stack",
     )
-
-    fig.update_layout(barmode="stack", xaxis_tickangle=-45)
-
-    st.plotly_chart(fig, use_container_width=True)
+    show_name_drilldown(reports_df, ["workspace_name", "Reportstatus Based on Dataset"], key="report_status")
 
 
 with col2:
     st.subheader("Overall Report Status Share")
     status_counts = reports_df["Reportstatus Based on Dataset"].value_counts()
-    fig, ax = plt.subplots(figsize=(6, 3))
-
-    wedges, texts, autotexts = ax.pie(
-        status_counts,
-        labels=status_counts.index,
-        autopct="%1.1f%%",
-        colors=[ "#87CEEB", "red", "orange","gray"],
-        startangle=150
-    )
-    for text in texts:
-        text.set_fontweight("bold")
-    ax.axis("equal")
-    st.pyplot(fig)
+    plot_pie(status_counts, "Status", color_map=report_status_colors)
 
 
 
@@ -272,6 +248,7 @@ elif st.session_state.view_reports:
 # Explore Reports Table View
 elif st.session_state.explore_reports_dataframe:
     st.header(" 📊 Full Reports Table Grouped by Workspace")
+    export_format = select_export_format("reports_export_format", len(reports_df))
     for ws_name, group in reports_df.groupby("workspace_name"):
 
         renamed_df = group.rename(columns={
@@ -284,13 +261,8 @@ elif st.session_state.explore_reports_dataframe:
         with col1:
             st.markdown(f"Workspace: `{ws_name}` ({len(group)} reports)")
         with col2:
-            csv = renamed_df.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name=f"{ws_name}_activity_log.csv",
-                mime="text/csv"
-            )
+            export_button(renamed_df, rows_filters("workspace_reports", renamed_df), f"{ws_name}_activity_log",
+                          export_format, key=f"export_reports_{ws_name}")
 
         st.dataframe(renamed_df, use_container_width=True)
 
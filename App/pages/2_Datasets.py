@@ -1,17 +1,11 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from utils import  render_profile_header
-import plotly.express as px
-from utils import get_cached_workspace_data, apply_sidebar_style, show_workspace, add_logout_button
+from utils import get_cached_workspace_data, init_page, show_logo, show_workspace, add_logout_button
+from utils import plot_bar, plot_line, summarize_names, show_name_drilldown
+from utils import select_export_format, export_button, rows_filters
 
-apply_sidebar_style()
-def inject_external_style():
-    with open("static/style.css") as f:
-        css = f.read()
-        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
-inject_external_style()
+init_page()
 
 if not (st.session_state.get("access_token") and
         st.session_state.get("user_email")):
@@ -23,9 +17,7 @@ render_profile_header()
 show_workspace()
 
 
-col1, col2, col3 = st.columns(3)
-with col2:
-    st.image("./images/dover_log.png")
+show_logo()
 
 st.markdown("<h1 style='text-align: center;'>📊 Datasets</h1>", unsafe_allow_html=True)
 st.markdown("""
@@ -91,38 +83,24 @@ col1, col2 = st.columns(2)
 with col1:
     st.header( "📊Refreshable vs Static Datasets")
     datasets_df["RefreshType"] = datasets_df["isRefreshable"].map({True: "Refreshable", False: "Static"})
-    datasets_df["hover_info"] = datasets_df["name"]
-
-    grouped = (
-        datasets_df
-        .groupby(["workspace_name", "RefreshType"])
-        .agg(
-            Count=("name", "count"),
-            DatasetNames=("hover_info", lambda x: "<br>".join(x))
-        )
-        .reset_index()
-    )
+    grouped = summarize_names(datasets_df, ["workspace_name", "RefreshType"], label="DatasetNames")
     # Total counts
     total_refreshable = (datasets_df["RefreshType"] == "Refreshable").sum()
     total_static = (datasets_df["RefreshType"] == "Static").sum()
     st.write(f"✅ Refreshable Datasets: {total_refreshable}",f"🚫 Static Datasets: {total_static}")
 
-    fig = px.bar(
+    plot_bar(
         grouped,
         x="workspace_name",
         y="Count",
         color="RefreshType",
+        color_map={"Refreshable": "#4CAF50", "Static": "#F44336"},
+        text_position="outside",
         text="Count",
         hover_data={"DatasetNames": True, "Count": False, "RefreshType": True},
         barmode="group",
-        color_discrete_map={"Refreshable": "#4CAF50", "Static": "#F44336"},
-        
     )
 
-    fig.update_traces(textposition="outside")
-
-    st.plotly_chart(fig, use_container_width=True)
-
 with col2:
     st.header("📅 Dataset Creation Timeline")
     datasets_df["createdDate"] = pd.to_datetime(datasets_df["createdDate"], errors="coerce")
@@ -130,24 +108,17 @@ with col2:
     datasets_df["hover_info"] = datasets_df["name"] + " (" + datasets_df["workspace_name"] + ")"
 
     # Group and summarize
-    grouped = datasets_df.groupby("createdTime").agg({
-        "name": "count",
-        "hover_info": lambda x: "<br>".join(x)
-    }).rename(columns={"name": "Count", "hover_info": "Dataset Details"}).reset_index()
+    grouped = summarize_names(datasets_df, ["createdTime"], name_col="hover_info", label="Dataset Details")
 
-    # Plotly line chart
-    fig = px.line(
+    plot_line(
         grouped,
         x="createdTime",
         y="Count",
+        color=None,
+        text_position="top center",
         text="Count",
-        markers=True,
         hover_data={"Dataset Details": True, "Count": False},
-        
     )
-
-    fig.update_traces(textposition="top center")
-    st.plotly_chart(fig, use_container_width=True)
         
 
 st.subheader("📊 Dataset Freshness Status")
@@ -169,13 +140,11 @@ if st.session_state["show_dataset_description"]:
       <li><span style="color:red;"><b>Expired</b></span> – Not refreshable or deprecated datasets.</li>
       <li><span style="color:#a6a6a6;"><b>Unknown</b></span> – Status could not be determined or missing.</li>
     </ul>
-    Hover over bar segments to reveal the list of dataset names and their count.
+    Hover over bar segments to reveal their count and a sample of dataset names; use the drill-down below the chart for the full list.
     </div>
     """, unsafe_allow_html=True)
 
-health_data = datasets_df.groupby(["workspace_name", "Dataset Freshness Status"])["name"].agg(list).reset_index()
-health_data["Count"] = health_data["name"].apply(len)
-health_data["Dataset Names"] = health_data["name"].apply(lambda x: "<br>".join(x))
+health_data = summarize_names(datasets_df, ["workspace_name", "Dataset Freshness Status"], label="Dataset Names")
 
 dataset_status_colors = {
     "Up to Date": "#87CEEB",          
@@ -183,21 +152,20 @@ dataset_status_colors = {
     "Expired": "#F44336",         
     "Unknown": "#a6a6a6",          
 }
-fig = px.bar(
+plot_bar(
     health_data,
     x="workspace_name",
     y="Count",
+    title="Dataset Freshness Status by Workspace",
     color="Dataset Freshness Status",
+    color_map=dataset_status_colors,
+    tickangle=-45,
     text="Count",
-    color_discrete_map=dataset_status_colors,
-    hover_data={"Dataset Names": True, "Count": True, "workspace_name": False, "name": False},
+    hover_data={"Dataset Names": True, "Count": True, "workspace_name": False},
     labels={"workspace_name": "Workspace", "Count": "Number of Datasets"},
-    title="Dataset Freshness Status by Workspace"
+    barmode="stack",
 )
-
-fig.update_layout(barmode="stack", xaxis_tickangle=-45)
-
-st.plotly_chart(fig, use_container_width=True)
+show_name_drilldown(datasets_df, ["workspace_name", "Dataset Freshness Status"], key="dataset_health")
 
 colA, colB = st.columns([1, 1])
 with colA:
@@ -299,6 +267,7 @@ elif st.session_state.view_datasets:
 # Explore DataFrame View
 elif st.session_state.explore_datasets_dataframe:
     st.markdown("## 📊 Full Datasets Table by Workspace")
+    export_format = select_export_format("datasets_export_format", len(datasets_df))
 
     for ws_name, group in datasets_df.groupby("workspace_name"):
         renamed_df = ( group[display_cols].rename(columns={
@@ -315,12 +284,7 @@ elif st.session_state.explore_datasets_dataframe:
         with col1:
             st.markdown(f"### 🏢 Workspace: `{ws_name}`")
         with col2:
-            csv = renamed_df.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name=f"{ws_name}_datasets.csv",
-                mime="text/csv"
-            )
+            export_button(renamed_df, rows_filters("workspace_datasets", renamed_df), f"{ws_name}_datasets",
+                          export_format, key=f"export_datasets_{ws_name}")
 
         st.dataframe(renamed_df, use_container_width=True)
@@ -1,17 +1,11 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
-import plotly.express as px
-from utils import get_cached_workspace_data, apply_sidebar_style, show_workspace
+from utils import get_cached_workspace_data, init_page, show_logo, show_workspace
 from utils import  render_profile_header, add_logout_button
+from utils import plot_bar, plot_pie, plot_treemap
+from utils import select_export_format, export_button, rows_filters
 
-apply_sidebar_style()
-def inject_external_style():
-    with open("static/style.css") as f:
-        css = f.read()
-        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
-inject_external_style()
+init_page()
 
 if not (st.session_state.get("access_token") and
         st.session_state.get("user_email")):
@@ -22,9 +16,7 @@ add_logout_button()
 render_profile_header()
 show_workspace()
 
-col1, col2, col3 = st.columns(3)
-with col2:
-    st.image("./images/dover_log.png")
+show_logo()
 
 st.markdown("<h1 style='text-align: center;'>👥 Users</h1>", unsafe_allow_html=True)
 # Dashboard Description
@@ -65,39 +57,19 @@ col1, col2 = st.columns([4,5])
 with col1:
     st.subheader("📊 Group User Access Rights")
     role_counts = users_df["groupUserAccessRight"].value_counts()
-    labels = role_counts.index
-    sizes = role_counts.values
     role_colors = {
         "Admin": "OrangeRed",
         "Contributor": "DodgerBlue",
         "Viewer": "DimGray",
         "Member": "MediumSeaGreen"
     }
-    colors = [role_colors.get(role, "LightGray") for role in labels]
-
-    fig, ax = plt.subplots(figsize=(4, 3.5))
-    wedges, texts, autotexts = ax.pie(
-        sizes,
-        labels=labels,
-        autopct="%1.1f%%",
-        startangle=140,
-        colors=colors,
-        wedgeprops=dict(width=0.3),
-        textprops={'fontsize': 8}
-    )
-    ax.set_title("Group Access Rights", fontsize=10)
-    ax.axis("equal")
-    st.pyplot(fig)
+    plot_pie(role_counts, "Access Right", title="Group Access Rights", color_map=role_colors, hole=0.6)
 
 with col2:
     st.subheader("🌍 Workspace Access by Email Domain")
     users_df["Domain"] = users_df["emailAddress"].str.split("@").str[-1]
-    domain_counts = users_df["Domain"].value_counts().sort_values(ascending=False)
-
-    fig, ax = plt.subplots(figsize=(4.2, 3))
-    ax.set_title("Access by Email Domain")
-    sns.barplot(x=domain_counts.values, y=domain_counts.index, palette=["SkyBlue"] * len(domain_counts), ax=ax)
-    st.pyplot(fig)
+    domain_counts = users_df["Domain"].value_counts().rename_axis("Domain").reset_index(name="Users")
+    plot_bar(domain_counts, x="Users", y="Domain", title="Access by Email Domain", orientation="h")
 
 st.subheader("🌐 Email Domain Distribution by Workspace")
 
@@ -109,14 +81,7 @@ treemap_df = (
     .reset_index(name="User Count")
 )
 
-fig = px.treemap(
-    treemap_df,
-    path=["workspace_name", "Domain"],
-    values="User Count",
-    color="User Count",
-    color_continuous_scale="Blues"
-)
-st.plotly_chart(fig, use_container_width=True)
+plot_treemap(treemap_df, path=["workspace_name", "Domain"], values="User Count", color_scale="Blues")
 
 
 # Buttons for displaying user table or dataframe
@@ -161,6 +126,7 @@ if st.session_state.veiw_users:
 
 if st.session_state.Explore_users_dataframe:
     st.markdown("## 📊 Full Users Table by Workspace")
+    export_format = select_export_format("users_export_format", len(users_df))
     for ws_name, group in users_df.groupby("workspace_name"):
         
         # Reset index for clean table
@@ -170,12 +136,7 @@ if st.session_state.Explore_users_dataframe:
         with col1:
             st.markdown(f"### 🏢 Workspace: `{ws_name}`")
         with col2:
-            csv = group.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name=f"{ws_name}_user_activity.csv",
-                mime="text/csv"
-            )
+            export_button(group, rows_filters("workspace_users", group), f"{ws_name}_user_activity",
+                          export_format, key=f"export_users_{ws_name}")
 
         st.dataframe(group[["emailAddress", "groupUserAccessRight", "displayName", "workspace_name"]])
@@ -254,18 +254,18 @@
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from utils import get_cached_workspace_data, apply_sidebar_style, show_workspace
+from functools import partial
+from utils import get_cached_workspace_data, init_page, show_logo, show_workspace
 from utils import  render_profile_header, add_logout_button
-from utils import handle_activity_upload,apply_activity_status
+from utils import handle_activity_upload,compute_activity_status,find_unused_artifacts,select_activity_window
+from utils import plot_bar, plot_line, plot_heatmap, get_activity_engine, get_activity_store
+from utils import get_distinct_users, distinct_users_since, get_analysis_date, window_start
+from utils import select_export_format, export_button, rows_filters
+from utils import show_paged_table, show_frame_table
+from activity_store import ACTIVITY_RESULT_ROWS
+from analysis_clock import analysis_end
 
-apply_sidebar_style()
-def inject_external_style():
-    with open("static/style.css") as f:
-        css = f.read()
-        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
-inject_external_style()
+init_page()
 
 if not (st.session_state.get("access_token") and
         st.session_state.get("user_email")):
@@ -276,9 +276,7 @@ add_logout_button()
 render_profile_header()
 show_workspace()
 
-col1, col2, col3 = st.columns(3)
-with col2:
-    st.image("./images/dover_log.png")
+show_logo()
 
 st.markdown("<h1 style='text-align: center;'>🔍 Activity Log Insights</h1>", unsafe_allow_html=True)
 st.markdown("""
@@ -315,85 +313,59 @@ if activity_df is None or activity_df.empty:
     st.stop()
 
 
-activity_df, reports_df, datasets_df, users_df, latest_access = apply_activity_status(
-    activity_df, reports_df, datasets_df, users_df
+window, window_label = select_activity_window()
+activity_df, reports_df, datasets_df, users_df, latest_access = compute_activity_status(
+    activity_df, reports_df, datasets_df, users_df, window=window
 )
 
 
-with st.expander("📊 User Insights"):
-    
-    st.subheader("📊 Artifact Access Heatmap")
-
-    activity_df["User email"] = activity_df["User email"].astype(str).str.strip().str.lower()
-    activity_df["Artifact Name"] = activity_df["Artifact Name"].astype(str).str.strip()
-    activity_df = activity_df.dropna(subset=["User email", "Artifact Name"])
-    all_users = activity_df["User email"].unique()
-    all_artifacts = activity_df["Artifact Name"].unique()
-
-    access_counts = activity_df.groupby(["User email", "Artifact Name"]).size().reset_index(name="Access Count")
-    full_grid = pd.MultiIndex.from_product([all_users, all_artifacts], names=["User email", "Artifact Name"]).to_frame(index=False)
-    full_matrix = pd.merge(full_grid, access_counts, on=["User email", "Artifact Name"], how="left")
-    full_matrix["Access Count"] = full_matrix["Access Count"].fillna(0)
-    heatmap_data = full_matrix.pivot(index="User email", columns="Artifact Name", values="Access Count")
-    fig, ax = plt.subplots(figsize=(12, len(heatmap_data) * 0.3)) 
-    sns.heatmap(heatmap_data, cmap="YlGnBu", linewidths=0.3, ax=ax, cbar=True)
-    ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
-    ax.set_yticklabels(ax.get_yticklabels(), rotation=0)
-    ax.set_title("📊 Full Artifact Access Heatmap")
-    st.pyplot(fig)
-with st.expander("📈 Usage Trends"):
-    col3, col4 = st.columns(2)
-    with col3:
-        st.subheader("Top 10 Accessed Artifacts")
-        top_reports = activity_df["Artifact Name"].value_counts().head(10).reset_index()
-        top_reports.columns = ["Artifact Name", "Access Count"]
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.barplot(
-            data=top_reports,
-            x="Access Count",
-            y="Artifact Name",
-            palette=["#87CEEB"] * len(top_reports),  
-        )
-        ax.set_title("Top Artifacts")
-        st.pyplot(fig)
-    
-  
-    with col4:
-        st.subheader("Usage Trends By Opcos")
-        unique_users = activity_df.drop_duplicates(subset='User email')
-        unique_users["domain"] = unique_users["User email"].str.split('@').str[-1]
-        domain_counts = unique_users["domain"].value_counts()
-        fig, ax = plt.subplots(figsize=(7, 2))
-        ax.bar(domain_counts.index, domain_counts.values, color="#87CEEB")  # Sky blue bars
-        ax.set_title("Users per Opcos")
-        ax.set_xlabel("Email Domain")
-        ax.set_ylabel("Number of Users")
-        ax.tick_params(axis='x', rotation=45)
-        st.pyplot(fig)
-
-with st.expander("📅 Weekly and Monthly Access Patterns"):
-    col5, col6 = st.columns(2)
-    with col5:
-        st.subheader("📆 Weekday Activity")
-        activity_df["Weekday"] = activity_df["Activity time"].dt.day_name()
-        weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        weekday_counts = activity_df["Weekday"].value_counts().reindex(weekday_order)
-        fig, ax = plt.subplots(figsize=(6, 3))
-        ax.plot(weekday_counts.index, weekday_counts.values, marker='o', linestyle='-', color='orange')
-        ax.set_title("Weekday Activity")
-        st.pyplot(fig)
-    with col6:
-        st.subheader("📆 Monthly Usage Trend")
-        activity_df["YearMonth"] = activity_df["Activity time"].dt.to_period("M").astype(str)
-        monthly_usage = activity_df.groupby("YearMonth").size().reset_index(name="Access Count")
-        monthly_usage["YearMonth"] = pd.to_datetime(monthly_usage["YearMonth"])
-        monthly_usage = monthly_usage.sort_values("YearMonth")
-        fig, ax = plt.subplots(figsize=(6, 2))
-        sns.barplot(data=monthly_usage, x="YearMonth", y="Access Count", color="skyblue", ax=ax)
-        ax.set_title("Monthly Usage")
-        ax.set_xticklabels([d.strftime('%b %Y') for d in monthly_usage["YearMonth"]], rotation=45)
-        st.pyplot(fig)
-            
+activity_df["User email"] = activity_df["User email"].astype(str).str.strip().str.lower()
+activity_df["Artifact Name"] = activity_df["Artifact Name"].astype(str).str.strip()
+activity_df = activity_df.dropna(subset=["User email", "Artifact Name"])
+store = get_activity_store()
+# The raw log views stop at the analysis date, like the rest of the page
+events_until = analysis_end(get_analysis_date())
+missing_store = "⚠️ The raw activity log is not available. Reset and upload the activity CSV again."
+workspace_artifact_ids = set(reports_df["id"]).union(set(datasets_df["id"]))
+engine = get_activity_engine(activity_df, scope=workspace_artifact_ids)
+
+# Chart sections only compute and render while their expander is open
+user_insights = st.expander("📊 User Insights", key="user_insights_section", on_change="rerun")
+if user_insights.open:
+    with user_insights:
+        st.subheader("📊 Artifact Access Heatmap")
+        heatmap_data = engine.access_matrix()
+        plot_heatmap(heatmap_data, title="📊 Full Artifact Access Heatmap")
+
+usage_trends = st.expander("📈 Usage Trends", key="usage_trends_section", on_change="rerun")
+if usage_trends.open:
+    with usage_trends:
+        col3, col4 = st.columns(2)
+        with col3:
+            st.subheader("Top 10 Accessed Artifacts")
+            top_reports = engine.top_artifacts(10)
+            plot_bar(top_reports, x="Access Count", y="Artifact Name", title="Top Artifacts", orientation="h")
+
+        with col4:
+            st.subheader("Usage Trends By Opcos")
+            # Merged from the store's distinct-user sketches when it has them
+            distinct = get_distinct_users()
+            domain_counts = (distinct.users_per_domain(workspace_artifact_ids) if distinct is not None
+                             else engine.users_per_domain())
+            plot_bar(domain_counts, x="Email Domain", y="Number of Users", title="Users per Opcos")
+
+access_patterns = st.expander("📅 Weekly and Monthly Access Patterns", key="access_patterns_section", on_change="rerun")
+if access_patterns.open:
+    with access_patterns:
+        col5, col6 = st.columns(2)
+        with col5:
+            st.subheader("📆 Weekday Activity")
+            weekday_counts = engine.weekday_counts()
+            plot_line(weekday_counts, x="Weekday", y="Access Count", title="Weekday Activity")
+        with col6:
+            st.subheader("📆 Monthly Usage Trend")
+            monthly_usage = engine.monthly_counts()
+            plot_bar(monthly_usage, x="YearMonth", y="Access Count", title="Monthly Usage")
 
 st.markdown("""<hr style="margin-top:3rem; margin-bottom:2rem;">""", unsafe_allow_html=True)
 
@@ -419,45 +391,55 @@ selected_value = activity_options[selected_key]
 if selected_value == "activity":
     st.subheader("📁 Activity Log Insights")
     st.info("View all raw activity logs including who accessed what and when.")
-    activity_df.reset_index(drop=True, inplace=True)
-
-    st.dataframe(activity_df[["Activity time","User email", "Activity", "Artifact Name"]])
+    # Sorted and filtered in the Parquet scan; only the visible page reaches the browser
+    event_columns = ["Activity time", "User email", "Activity", "Artifact Name"]
+    if store is None:
+        st.warning(missing_store)
+    else:
+        show_paged_table(partial(store.page, event_columns, artifact_ids=workspace_artifact_ids, until=events_until),
+                         event_columns, "activity_log_table", sort="Activity time", descending=True)
 
 
 elif selected_value == "recent":
     st.subheader("📌 Most Recently Accessed Artifacts")
     st.info("Displays the most recently accessed reports or datasets. Helps in identifying active artifacts.")
-    latest_access1 = latest_access.reset_index(drop=True)
-    st.dataframe(latest_access1[["Latest Activity","User email", "Activity", "Artifact Name"]])
+    show_frame_table(latest_access, ["Latest Activity","User email", "Activity", "Artifact Name"], "recent_table",
+                     sort="Latest Activity", descending=True)
 
 elif selected_value == "users":
     st.subheader("📌 Users Activity Status")
     st.info("Shows each user's latest access time and whether they are marked active or inactive.")
-    st.dataframe(users_df[["emailAddress", "groupUserAccessRight", "displayName", "workspace_name","activityStatus","Latest Activity Time"]])
+    show_frame_table(users_df, ["emailAddress", "groupUserAccessRight", "displayName", "workspace_name","activityStatus","Latest Activity Time"],
+                     "users_activity_table")
 
 elif selected_value == "reports":
     st.subheader("📌 Reports Latest Activity")
     st.info("Details of reports along with their last usage and activity status.")
-    st.dataframe(reports_df[["name","Reportstatus Based on Dataset","Activity Status","Latest Artifact Activity"]])
+    reports_df["Distinct Users"] = distinct_users_since(reports_df["id"], window_start(window, get_analysis_date()))
+    st.caption(f"Distinct Users: estimated users within the activity window ({window_label}).")
+    show_frame_table(reports_df, ["name","Reportstatus Based on Dataset","Activity Status","Latest Artifact Activity","Distinct Users"],
+                     "reports_activity_table")
 
 elif selected_value == "datasets":
     st.subheader("📌 Datasets Latest Activity")
     st.info("Displays dataset-level activity insights, freshness status, and usage history.")
-    st.dataframe(datasets_df[[ "name","configuredBy","isRefreshable","createdDate","outdated","Dataset Freshness Status","Activity Status","Latest Artifact Activity"]])
+    datasets_df["Distinct Users"] = distinct_users_since(datasets_df["id"], window_start(window, get_analysis_date()))
+    st.caption(f"Distinct Users: estimated users within the activity window ({window_label}).")
+    show_frame_table(datasets_df, [ "name","configuredBy","isRefreshable","createdDate","outdated","Dataset Freshness Status","Activity Status","Latest Artifact Activity","Distinct Users"],
+                     "datasets_activity_table")
 
 elif selected_value == "artifacts":
     st.info("Lists reports and datasets that haven't been accessed at all recently. Useful for cleanup.")
 
-    report_names = reports_df["name"]
-    dataset_names = datasets_df["name"]
-    all_artifact_names = pd.concat([report_names, dataset_names], ignore_index=True).dropna().unique()
-    used_artifact_names = activity_df["Artifact Name"].dropna().unique()
-    artifact_status_df = pd.DataFrame(all_artifact_names, columns=["Artifact Name"])
-    artifact_status_df["Usage Status"] = artifact_status_df["Artifact Name"].apply(
-        lambda x: "Used" if x in used_artifact_names else "Unused"
-    )
-    unused_artifacts_df = artifact_status_df[artifact_status_df["Usage Status"] == "Unused"]
+    scope = st.radio("Not accessed", ["in the activity log", f"within the activity window ({window_label})"],
+                     horizontal=True, key="unused_scope")
+    since = window_start(window, get_analysis_date()) if scope != "in the activity log" else None
+    unused_artifacts_df = find_unused_artifacts(activity_df, reports_df, datasets_df, since=since)
     st.subheader("📭 Unused Artifacts")
+    st.caption(f"{len(unused_artifacts_df):,} of {len(reports_df) + len(datasets_df):,} reports and datasets.")
+    export_button(unused_artifacts_df, rows_filters("unused_artifacts", unused_artifacts_df), "unused_artifacts",
+                  select_export_format("unused_export_format", len(unused_artifacts_df)),
+                  label="📥 Download cleanup list", key="export_unused")
     st.dataframe(unused_artifacts_df, use_container_width=True)
 
 st.markdown("""<hr style="margin-top:1rem; margin-bottom:1rem;">""", unsafe_allow_html=True)
@@ -479,39 +461,44 @@ with col1:
     start_date = st.date_input("📅 Start Date", value=None, key="start_date")
 with col2:
     end_date = st.date_input("📅 End Date", value=None, key="end_date")
+# Picked before searching: changing it reruns the page, which clears the results
+export_format = select_export_format("actions_export_format", ACTIVITY_RESULT_ROWS)
 
 if st.button("🔍 Search"):
     st.session_state.run_filter = True
 
+if st.session_state.get("run_filter", False) and store is None:
+    st.warning(missing_store)
+    st.session_state.run_filter = False
+
 if st.session_state.get("run_filter", False):
-    filtered_df = activity_df.copy()
-    
-    if st.session_state.start_date:
-        filtered_df = filtered_df[filtered_df["Activity time"] >= pd.to_datetime(st.session_state.start_date)]
-    if st.session_state.end_date:
-        filtered_df = filtered_df[filtered_df["Activity time"] <= pd.to_datetime(st.session_state.end_date)]
-
-    if st.session_state.search_term:
-        filtered_df = filtered_df[
-            filtered_df["Artifact Name"].str.contains(st.session_state.search_term, case=False, na=False) |
-            filtered_df["User email"].str.contains(st.session_state.search_term, case=False, na=False) |
-            filtered_df["Activity"].str.contains(st.session_state.search_term, case=False, na=False)
-        ]
+    # Filters run inside the Parquet scan of the raw events
+    filtered_df, total = store.events(
+        ["User email", "Artifact Name", "Activity time", "Activity"],
+        artifact_ids=workspace_artifact_ids,
+        start=st.session_state.start_date or None,
+        end=st.session_state.end_date or None,
+        search=st.session_state.search_term,
+        limit=ACTIVITY_RESULT_ROWS,
+        until=events_until,
+    )
+    if total > len(filtered_df):
+        st.caption(f"Showing the first {len(filtered_df):,} of {total:,} matching events. Narrow the search to see the rest.")
 
     filtered_df = filtered_df.sort_values("Activity time", ascending=False).reset_index(drop=True)
 
     if "Activity" in filtered_df.columns:
+        # The search, not the rows, identifies each group's export
+        search_filters = (
+            store.key, tuple(sorted(workspace_ids)), events_until,
+            st.session_state.search_term, st.session_state.start_date, st.session_state.end_date, ACTIVITY_RESULT_ROWS,
+        )
         grouped_actions = filtered_df.groupby("Activity")
         for action, group in grouped_actions:
             with st.expander(f"🧩 {action} ({len(group)} activities)", expanded=False):
                 st.dataframe(group[["User email", "Artifact Name", "Activity time"]])
-                csv = group.to_csv(index=False).encode("utf-8")
-                st.download_button(
-                    label="📥 Download CSV",
-                    data=csv,
-                    file_name=f"{action}_activity_log.csv",
-                    mime="text/csv"
-                )
+                export_button(group, ("activity_actions", search_filters, action), f"{action}_activity_log",
+                              export_format, key=f"export_action_{action}")
     else:
         st.info("⚠️ 'Activity' column is missing from the dataset.")
 
@@ -1,16 +1,10 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from utils import  apply_sidebar_style, show_workspace, render_profile_header
-from utils import handle_activity_upload,validate_session,apply_activity_status
-from utils import get_cached_workspace_data, add_logout_button
-
-apply_sidebar_style()
-def inject_external_style():
-    with open("static/style.css") as f:
-        css = f.read()
-        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
-inject_external_style()
+from utils import  init_page, show_logo, show_workspace, render_profile_header
+from utils import handle_activity_upload,validate_session,compute_activity_status,select_activity_window
+from utils import get_cached_workspace_data, add_logout_button, show_chart
+
+init_page()
 
 if not (st.session_state.get("access_token") and
         st.session_state.get("user_email")):
@@ -23,9 +17,7 @@ show_workspace()
 
 st.set_page_config(page_title="Active vs Inactive Summary", layout="wide", page_icon="📍")
 
-col1, col2, col3 = st.columns(3)
-with col2:
-    st.image("./images/dover_log.png")
+show_logo()
 
 st.markdown("""
 <h1 style='text-align: center;'>📍 Active vs Inactive Summary</h1>
@@ -132,21 +124,11 @@ if activity_df is None or activity_df.empty:
     st.stop()
 
 
-activity_df["Activity time"] = pd.to_datetime(activity_df["Activity time"], errors="coerce")
-activity_df = activity_df.sort_values("Activity time")
-
-workspace_artifact_ids = set(reports_df["id"]).union(set(datasets_df["id"]))
-activity_df = activity_df[activity_df["ArtifactId"].isin(workspace_artifact_ids)]
-
-cutoff_date = pd.Timestamp.now() - pd.DateOffset(months=3)
-latest_access = activity_df.drop_duplicates(subset="Artifact Name", keep="last")
-recent_user_activity = activity_df[activity_df["Activity time"] >= cutoff_date]
-recent_users = recent_user_activity["User email"].dropna().unique()
-recent_artifacts = latest_access["ArtifactId"].unique()
-
-users_df["activityStatus"] = users_df["emailAddress"].apply(lambda x: "Active" if x in recent_users else "Inactive")
-reports_df["Activity Status"] = reports_df["id"].apply(lambda x: "Active" if x in recent_artifacts else "Inactive")
-datasets_df["Activity Status"] = datasets_df["id"].apply(lambda x: "Active" if x in recent_artifacts else "Inactive")
+window, window_label = select_activity_window()
+activity_df, reports_df, datasets_df, users_df, latest_access = compute_activity_status(
+    activity_df, reports_df, datasets_df, users_df, window=window
+)
+st.caption(f"🕒 Active means accessed within the activity window: {window_label}.")
 
 k1, k2, k3 = st.columns(3)
 with k1:
@@ -163,6 +145,7 @@ st.markdown("### Activity Distribution")
 col4, col5, col6 = st.columns(3)
 
 def plot_donut(data, label, color1="#0A6EBD", color2="#274472"):
+    import plotly.express as px
     counts = data.value_counts().reset_index()
     counts.columns = [label, "Count"]
     fig = px.pie(
@@ -176,11 +159,11 @@ def plot_donut(data, label, color1="#0A6EBD", color2="#274472"):
     return fig
 
 with col4:
-    st.plotly_chart(plot_donut(reports_df["Activity Status"], "Reports"), use_container_width=True)
+    show_chart(plot_donut(reports_df["Activity Status"], "Reports"))
 with col5:
-    st.plotly_chart(plot_donut(datasets_df["Activity Status"], "Datasets"), use_container_width=True)
+    show_chart(plot_donut(datasets_df["Activity Status"], "Datasets"))
 with col6:
-    st.plotly_chart(plot_donut(users_df["activityStatus"], "Users"), use_container_width=True)
+    show_chart(plot_donut(users_df["activityStatus"], "Users"))
 
 st.markdown("### 🔍 View Detailed Tables")
 option = st.selectbox("Choose an asset group to explore:", [
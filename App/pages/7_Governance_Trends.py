@@ -0,0 +1,76 @@
+import streamlit as st
+import pandas as pd
+from utils import init_page, show_logo, show_workspace
+from utils import  render_profile_header, add_logout_button
+from utils import get_status_trend, get_snapshot_dates, plot_bar, plot_line
+
+init_page()
+
+if not (st.session_state.get("access_token") and
+        st.session_state.get("user_email")):
+    st.warning("🔐 Authentication Required")
+    st.stop()
+
+add_logout_button()
+render_profile_header()
+show_workspace()
+
+show_logo()
+
+st.markdown("<h1 style='text-align: center;'>📈 Governance Trends</h1>", unsafe_allow_html=True)
+st.markdown("""
+<div style='text-align: center; font-size: 1.05rem; background-color: #E7DBF3; padding: 14px 24px; border-left: 6px solid #673ab7; border-radius: 8px; margin-bottom: 25px;'>
+Track how report, dataset and user health changes over time in the selected workspaces.
+Figures come from the daily governance snapshots written by the scheduled governance report.
+</div><hr>
+""", unsafe_allow_html=True)
+
+status_colors = {
+    "Up to Date": "#87CEEB",
+    "Needs Attention": "#E2C312",
+    "Expired": "#F44336",
+    "Unknown": "#a6a6a6",
+    "Active": "#4CAF50",
+    "Inactive": "#F44336",
+}
+
+# Inactive count per snapshot day, zero on days where everything was active
+def inactive_counts(trend, status_col):
+    counts = trend.pivot_table(index="snapshot_date", columns=status_col, values="Count", aggfunc="sum", fill_value=0)
+    return counts.get("Inactive", pd.Series(0, index=counts.index)).rename("Count").reset_index()
+
+dates = get_snapshot_dates("reports")
+if not dates:
+    st.info("📭 No governance snapshots yet. Schedule `governance_report.py --snapshot` to record one per day.")
+    st.stop()
+
+workspace_ids = tuple(st.session_state.workspace_ids)
+start, end = dates[0], dates[-1]
+if len(dates) > 1:
+    start, end = st.select_slider("📅 Snapshot range", options=dates, value=(dates[0], dates[-1]))
+
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("📄 Report Status")
+    trend = get_status_trend("reports", "Reportstatus Based on Dataset", start, end, workspace_ids)
+    plot_bar(trend, "snapshot_date", "Count", color="Reportstatus Based on Dataset", color_map=status_colors)
+with col2:
+    st.subheader("🗃️ Dataset Freshness")
+    trend = get_status_trend("datasets", "Dataset Freshness Status", start, end, workspace_ids)
+    plot_bar(trend, "snapshot_date", "Count", color="Dataset Freshness Status", color_map=status_colors)
+
+col3, col4 = st.columns(2)
+with col3:
+    st.subheader("💤 Inactive Reports")
+    trend = get_status_trend("reports", "Activity Status", start, end, workspace_ids)
+    if trend.empty:
+        st.info("No activity status in these snapshots. Run the report with `--activity` to include it.")
+    else:
+        plot_line(inactive_counts(trend, "Activity Status"), "snapshot_date", "Count", color=status_colors["Inactive"])
+with col4:
+    st.subheader("👤 Inactive Users")
+    trend = get_status_trend("users", "activityStatus", start, end, workspace_ids)
+    if trend.empty:
+        st.info("No activity status in these snapshots. Run the report with `--activity` to include it.")
+    else:
+        plot_line(inactive_counts(trend, "activityStatus"), "snapshot_date", "Count", color=status_colors["Inactive"])
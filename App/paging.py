@@ -0,0 +1,27 @@
+import os
+
+import pandas as pd
+
+# Paged tables: pages send one window of PBI_TABLE_PAGE_ROWS rows to the
+# browser instead of a whole frame, with the filter and sort applied on the
+# server. A page source is any function
+#   fetch(sort, descending, search, offset, rows) -> (page frame, matching rows)
+# such as frame_page for frames in memory or ActivityStore.page for the
+# raw events on disk.
+PAGE_ROWS = int(os.environ.get("PBI_TABLE_PAGE_ROWS", "500"))
+
+
+# Rows whose text contains `search` (case-insensitive, not a pattern)
+def search_rows(df, search):
+    mask = pd.Series(False, index=df.index)
+    for column in df.columns:
+        mask |= df[column].astype(str).str.contains(search, case=False, regex=False, na=False)
+    return df[mask]
+
+
+def frame_page(df, sort=None, descending=False, search=None, offset=0, rows=PAGE_ROWS):
+    if search:
+        df = search_rows(df, search)
+    if sort is not None:
+        df = df.sort_values(sort, ascending=not descending, na_position="last", kind="stable")
+    return df.iloc[offset:offset + rows], len(df)
@@ -0,0 +1,203 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Lightweight timing spans. Every Streamlit script run happens on its own
+# thread, so spans are collected in a thread-local run that init_page()
+# starts; process-wide totals are kept for export.
+PERF_PANEL_ENABLED = os.environ.get("PBI_PERF_PANEL", "") == "1"
+PROFILE_ALL_RUNS = os.environ.get("PBI_PROFILE", "") == "1"
+PROFILE_DIR = os.environ.get("PBI_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "pbi_governance_profiles"))
+PROFILE_KEEP = int(os.environ.get("PBI_PROFILE_KEEP", "20"))
+ADMIN_EMAILS = {e.strip().lower() for e in os.environ.get("PBI_ADMIN_EMAILS", "").split(",") if e.strip()}
+
+_local = threading.local()
+_totals = {}
+_totals_lock = threading.Lock()
+
+
+class PerfRun:
+    def __init__(self, page):
+        self.page = page
+        self.started = time.time()
+        self.spans = {}
+        self.depth = 0
+        self.on_span = None
+
+    def record(self, name, seconds):
+        stats = self.spans.setdefault(name, {"calls": 0, "seconds": 0.0, "max": 0.0})
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+
+    def to_dict(self):
+        return {
+            "page": self.page,
+            "started": self.started,
+            "elapsed": time.time() - self.started,
+            "spans": {k: dict(v) for k, v in self.spans.items()},
+        }
+
+
+def start_run(page):
+    _local.run = PerfRun(page)
+    return _local.run
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+@contextmanager
+def span(name):
+    run = current_run()
+    if run is not None:
+        run.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        page = run.page if run is not None else ""
+        with _totals_lock:
+            stats = _totals.setdefault((page, name), {"calls": 0, "seconds": 0.0, "max": 0.0})
+            stats["calls"] += 1
+            stats["seconds"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+        if run is not None:
+            run.depth -= 1
+            run.record(name, elapsed)
+            # Lets the sidebar panel refresh once an outermost span finishes
+            if run.depth == 0 and run.on_span is not None:
+                run.on_span(run)
+
+
+def timed(name=None):
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def totals():
+    with _totals_lock:
+        return {key: dict(stats) for key, stats in _totals.items()}
+
+
+def export_json(run=None):
+    return json.dumps({
+        "run": run.to_dict() if run is not None else None,
+        "totals": [dict(page=page, span=name, **stats) for (page, name), stats in sorted(totals().items())],
+    }, indent=2)
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+PROMETHEUS_METRICS = [
+    ("pbi_span_seconds_total", "counter", "seconds", "Time spent in instrumented sections."),
+    ("pbi_span_calls_total", "counter", "calls", "Calls of instrumented sections."),
+    ("pbi_span_seconds_max", "gauge", "max", "Slowest single call of instrumented sections."),
+]
+
+
+def export_prometheus():
+    current = sorted(totals().items())
+    lines = []
+    for metric, kind, field, help_text in PROMETHEUS_METRICS:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for (page, name), stats in current:
+            value = stats[field] if field == "calls" else f"{stats[field]:.6f}"
+            lines.append(f'{metric}{{page="{_label(page)}",span="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def is_admin(user_email):
+    # Only users listed in PBI_ADMIN_EMAILS; nobody when it is not set
+    return bool(ADMIN_EMAILS) and (user_email or "").lower() in ADMIN_EMAILS
+
+
+# Profiles one page execution with pyinstrument (sampling) when it is
+# installed, otherwise with cProfile
+class PageProfiler:
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+            self.kind = "pyinstrument"
+            self.profiler = Profiler()
+        except ImportError:
+            self.kind = "cprofile"
+            self.profiler = cProfile.Profile()
+        self.started = None
+        self.elapsed = None
+
+    def start(self):
+        _local.profiling = True
+        self.started = time.time()
+        if self.kind == "pyinstrument":
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.kind == "pyinstrument":
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+        self.elapsed = time.time() - self.started
+        _local.profiling = False
+
+    def summary(self, limit=30):
+        if self.kind == "pyinstrument":
+            return self.profiler.output_text(unicode=True)
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def save(self, page, inputs):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started)) + f"{self.started % 1:.3f}"[1:]
+        stem = f"{stamp}_{re.sub(r'[^A-Za-z0-9]+', '_', page)}"
+        path = os.path.join(PROFILE_DIR, stem + (".html" if self.kind == "pyinstrument" else ".prof"))
+        if self.kind == "pyinstrument":
+            with open(path, "w") as f:
+                f.write(self.profiler.output_html())
+        else:
+            self.profiler.dump_stats(path)
+        meta = {"page": page, "started": self.started, "elapsed": self.elapsed, "profiler": self.kind,
+                "trace": os.path.basename(path), "inputs": inputs}
+        with open(os.path.join(PROFILE_DIR, stem + ".json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        prune_profiles()
+        return path, meta
+
+
+def profiling_active():
+    return getattr(_local, "profiling", False)
+
+
+def prune_profiles(keep=PROFILE_KEEP):
+    metas = sorted(f for f in os.listdir(PROFILE_DIR) if f.endswith(".json"))
+    for name in metas[:-keep] if keep else metas:
+        stem = name[:-len(".json")]
+        for ext in (".json", ".html", ".prof"):
+            # A concurrent run may have removed it already
+            try:
+                os.remove(os.path.join(PROFILE_DIR, stem + ext))
+            except FileNotFoundError:
+                pass
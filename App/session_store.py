@@ -0,0 +1,170 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+# Limits are set per deployment through environment variables
+MEMORY_BUDGET_MB = float(os.environ.get("PBI_SESSION_MEMORY_MB", "512"))
+IDLE_SESSION_SECONDS = int(os.environ.get("PBI_SESSION_IDLE_SECONDS", "1800"))
+SPILL_DIR = os.environ.get("PBI_SPILL_DIR", os.path.join(tempfile.gettempdir(), "pbi_governance_spill"))
+
+
+def frame_key(df):
+    digest = hashlib.sha1(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+# Process-wide store for large session DataFrames.
+# A frame is held once per content key and shared by every session that
+# references it. Frames without references are dropped, and the least
+# recently used frames are spilled to disk once the memory budget is exceeded.
+class SessionDataStore:
+    def __init__(self, budget_bytes, idle_seconds=IDLE_SESSION_SECONDS, spill_dir=SPILL_DIR):
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self.spill_dir = spill_dir
+        self.private_dir = None
+        self.lock = threading.RLock()
+        self.frames = {}
+        self.sessions = {}
+
+    def put(self, session_id, name, df, key=None):
+        key = key or frame_key(df)
+        with self.lock:
+            self.release(session_id, name)
+            entry = self.frames.get(key)
+            if entry is None:
+                entry = {"df": df, "path": None, "bytes": frame_bytes(df), "refs": set(), "last_used": time.time()}
+                self.frames[key] = entry
+            entry["refs"].add((session_id, name))
+            self._touch_session(session_id)["names"][name] = key
+            self._load(key)
+            self._enforce_budget(keep=key)
+            self.evict_idle()
+        return key
+
+    def get(self, session_id, name):
+        with self.lock:
+            if session_id not in self.sessions:
+                return None
+            key = self._touch_session(session_id)["names"].get(name)
+            if key is None or key not in self.frames:
+                return None
+            df = self._load(key)
+            self._enforce_budget(keep=key)
+            self.evict_idle()
+        # Pages add columns to the frames they get back; a shallow copy keeps
+        # those edits out of the shared entry
+        return df.copy(deep=False)
+
+    # Reference an already stored frame by key without sending it again
+    def attach(self, session_id, name, key):
+        with self.lock:
+            if key not in self.frames:
+                return False
+            if self.sessions.get(session_id, {}).get("names", {}).get(name) != key:
+                self.release(session_id, name)
+                self.frames[key]["refs"].add((session_id, name))
+                self._touch_session(session_id)["names"][name] = key
+            return True
+
+    def release(self, session_id, name=None):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return
+            names = [name] if name is not None else list(session["names"])
+            for n in names:
+                key = session["names"].pop(n, None)
+                entry = self.frames.get(key)
+                if entry is None:
+                    continue
+                entry["refs"].discard((session_id, n))
+                if not entry["refs"]:
+                    self._drop(key)
+            if name is None or not session["names"]:
+                self.sessions.pop(session_id, None)
+
+    def evict_idle(self, now=None):
+        now = now or time.time()
+        with self.lock:
+            idle = [sid for sid, s in self.sessions.items() if now - s["last_seen"] > self.idle_seconds]
+            for session_id in idle:
+                self.release(session_id)
+        return idle
+
+    # Keys of the stored frames, for callers caching results per frame
+    def keys(self):
+        with self.lock:
+            return set(self.frames)
+
+    def memory_bytes(self):
+        return sum(e["bytes"] for e in self.frames.values() if e["df"] is not None)
+
+    def usage(self):
+        rows = []
+        with self.lock:
+            for session_id, session in self.sessions.items():
+                in_memory = spilled = 0
+                for key in session["names"].values():
+                    entry = self.frames[key]
+                    # Shared frames are counted in full against every session using them
+                    if entry["df"] is not None:
+                        in_memory += entry["bytes"]
+                    else:
+                        spilled += entry["bytes"]
+                rows.append({
+                    "Session": session_id,
+                    "Frames": len(session["names"]),
+                    "In Memory (MB)": round(in_memory / 1e6, 2),
+                    "Spilled (MB)": round(spilled / 1e6, 2),
+                    "Idle (s)": int(time.time() - session["last_seen"]),
+                })
+        return pd.DataFrame(rows, columns=["Session", "Frames", "In Memory (MB)", "Spilled (MB)", "Idle (s)"])
+
+    def _touch_session(self, session_id):
+        session = self.sessions.setdefault(session_id, {"names": {}, "last_seen": 0})
+        session["last_seen"] = time.time()
+        return session
+
+    def _load(self, key):
+        entry = self.frames[key]
+        entry["last_used"] = time.time()
+        if entry["df"] is None:
+            entry["df"] = pd.read_pickle(entry["path"])
+        return entry["df"]
+
+    def _spill(self, key):
+        entry = self.frames[key]
+        if entry["path"] is None:
+            # Spill files are unpickled, so each store writes them to its own
+            # directory (mode 0700) under PBI_SPILL_DIR; other processes
+            # storing the same key never share or remove them
+            if self.private_dir is None:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                self.private_dir = tempfile.mkdtemp(prefix=f"store-{os.getpid()}-", dir=self.spill_dir)
+            entry["path"] = os.path.join(self.private_dir, f"{key}.pkl")
+            entry["df"].to_pickle(entry["path"])
+        entry["df"] = None
+
+    def _drop(self, key):
+        entry = self.frames.pop(key)
+        if entry["path"] and os.path.exists(entry["path"]):
+            os.remove(entry["path"])
+
+    def _enforce_budget(self, keep=None):
+        in_memory = sorted(
+            (e["last_used"], k) for k, e in self.frames.items() if e["df"] is not None and k != keep
+        )
+        for _, key in in_memory:
+            if self.memory_bytes() <= self.budget_bytes:
+                break
+            self._spill(key)
@@ -0,0 +1,86 @@
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+# Daily governance snapshots as Hive-partitioned Parquet:
+#   <PBI_SNAPSHOT_DIR>/<table>/snapshot_date=YYYY-MM-DD/part-0.parquet
+# Readers prune partitions by date and filter rows and columns inside the
+# Parquet scan, so trend queries only touch the data they need.
+SNAPSHOT_DIR = os.environ.get(
+    "PBI_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "snapshots")
+)
+SNAPSHOT_TABLES = ("reports", "datasets", "users")
+
+
+# Nested API columns (lists, dicts) are stored as JSON text
+def flatten_nested(df):
+    return df.apply(
+        lambda col: col.map(lambda v: json.dumps(v) if isinstance(v, (list, dict)) else v) if col.dtype == object else col
+    )
+
+
+def write_snapshot(tables, snapshot_date=None, root=SNAPSHOT_DIR):
+    snapshot_date = snapshot_date or time.strftime("%Y-%m-%d")
+    for table, df in tables.items():
+        partition = os.path.join(root, table, f"snapshot_date={snapshot_date}")
+        # Re-running on the same day replaces that day's partition
+        if os.path.isdir(partition):
+            shutil.rmtree(partition)
+        os.makedirs(partition)
+        flatten_nested(df).to_parquet(os.path.join(partition, "part-0.parquet"), index=False)
+    return snapshot_date
+
+
+def snapshot_dates(table, root=SNAPSHOT_DIR):
+    path = os.path.join(root, table)
+    if not os.path.isdir(path):
+        return []
+    return sorted(d.split("=", 1)[1] for d in os.listdir(path) if d.startswith("snapshot_date="))
+
+
+def open_dataset(table, root=SNAPSHOT_DIR):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(pa.schema([("snapshot_date", pa.string())]), flavor="hive")
+    dataset = ds.dataset(os.path.join(root, table), format="parquet", partitioning=partitioning)
+    # Columns can come and go between days (e.g. activity status), so the
+    # per-file schemas are merged and missing columns read as nulls
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    if not schemas:
+        return dataset
+    schema = pa.unify_schemas(schemas, promote_options="permissive").append(pa.field("snapshot_date", pa.string()))
+    return ds.dataset(os.path.join(root, table), format="parquet", partitioning=partitioning, schema=schema)
+
+
+def read_snapshots(table, columns=None, start=None, end=None, workspace_ids=None, root=SNAPSHOT_DIR):
+    import pyarrow.dataset as ds
+
+    if not snapshot_dates(table, root):
+        return pd.DataFrame(columns=columns)
+    dataset = open_dataset(table, root)
+    predicate = None
+    conditions = []
+    if start:
+        conditions.append(ds.field("snapshot_date") >= str(start))
+    if end:
+        conditions.append(ds.field("snapshot_date") <= str(end))
+    if workspace_ids is not None:
+        conditions.append(ds.field("workspace_id").isin(list(workspace_ids)))
+    for condition in conditions:
+        predicate = condition if predicate is None else predicate & condition
+    columns = [c for c in columns if c in dataset.schema.names] if columns else None
+    return dataset.to_table(columns=columns, filter=predicate).to_pandas()
+
+
+# Rows per snapshot day and status value, e.g. inactive reports over time
+def status_trend(table, status_col, start=None, end=None, workspace_ids=None, root=SNAPSHOT_DIR):
+    df = read_snapshots(table, ["snapshot_date", "workspace_id", status_col], start, end, workspace_ids, root)
+    if df.empty or status_col not in df.columns:
+        return pd.DataFrame(columns=["snapshot_date", status_col, "Count"])
+    trend = df.groupby(["snapshot_date", status_col]).size().reset_index(name="Count")
+    trend["snapshot_date"] = pd.to_datetime(trend["snapshot_date"])
+    return trend.sort_values("snapshot_date")
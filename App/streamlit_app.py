@@ -1,23 +1,15 @@
 
 import streamlit as st
-import requests
-from utils import apply_sidebar_style
-from utils import  render_profile_header, add_logout_button
+from utils import init_page, show_logo, release_session_frames, call_powerbi_api, POWERBI_API_BASE
+from utils import  render_profile_header, add_logout_button, show_governance_export
 
 st.set_page_config(page_title="Power BI Governance Dashboard", layout="wide", page_icon="📊")
-def inject_external_style():
-    with open("./static/style.css") as f:
-        css = f.read()
-        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 
-apply_sidebar_style()
-inject_external_style()
+init_page()
 render_profile_header()
 
 
-col1, col2, col3 = st.columns(3)
-with col2:
-    st.image("./images/dover_log.png")
+show_logo()
 
 col4, col5, col6 = st.columns([1,6,1])
 with col5:
@@ -27,6 +19,7 @@ st.markdown("---")
 
 # Reset session state
 def reset_session():
+    release_session_frames()
     for key in [
         "access_token",
         "user_email",
@@ -36,7 +29,9 @@ def reset_session():
         "workspace_options",
         "activity_df",
         "activity_filename",
-        "activity_csv"
+        "activity_csv",
+        "activity_key",
+        "export_job"
     ]:
         st.session_state.pop(key, None)
 
@@ -44,17 +39,13 @@ def reset_session():
 
 # Get all workspaces from Power BI API
 def get_all_workspaces(access_token):
-    url = "https://api.powerbi.com/v1.0/myorg/groups"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(url, headers=headers)
-    return response.json().get("value", []) if response.status_code == 200 else []
+    data = call_powerbi_api(f"{POWERBI_API_BASE}/groups", access_token, show_error=False)
+    return data.get("value", []) if data else []
 
 # Get users in workspace from Power BI API
 def get_users_in_workspace(workspace_id, access_token):
-    url = f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/users"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(url, headers=headers)
-    return [u.get("emailAddress", "") for u in response.json().get("value", [])] if response.status_code == 200 else []
+    data = call_powerbi_api(f"{POWERBI_API_BASE}/groups/{workspace_id}/users", access_token, show_error=False)
+    return [u.get("emailAddress", "") for u in data.get("value", [])] if data else []
 
 # Authentication section
 if not st.session_state.get("logged_in"):
@@ -111,3 +102,6 @@ else:
         st.warning("⚠️ Please select at least one workspace to proceed.")
         st.session_state.workspace_names = []
         st.session_state.workspace_ids = []
+
+    st.markdown("---")
+    show_governance_export()
@@ -1,12 +1,127 @@
+import hashlib
+import os
+import runpy
+import sys
+import time
 import requests
 import pandas as pd
 import streamlit as st
-
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from session_store import SessionDataStore, MEMORY_BUDGET_MB, frame_key
+from data_service import DataServiceClient, SERVICE_ADDRESS
+from perf import span, timed, start_run, export_json, export_prometheus, is_admin, PERF_PANEL_ENABLED
+from perf import PageProfiler, profiling_active, PROFILE_ALL_RUNS
+from workspace_cache import WorkspaceCache, WorkspaceFetchError
+from snapshot_store import snapshot_dates, status_trend
+from activity_engine import ActivityEngine
+from activity_store import ActivityStore, read_activity_chunks, iter_frame_chunks
+from heavy_hitters import HeavyHitters
+from distinct_users import DistinctUsers
+from last_seen import LastSeen, ACTIVITY_WINDOWS, DEFAULT_ACTIVITY_WINDOW, window_start, status_since
+from analysis_clock import analysis_date, activity_until
+from exports import EXPORT_FORMATS, available_formats, export_bytes, rows_filters
+from export_jobs import ExportJobs, bundle_formats
+from paging import PAGE_ROWS, frame_page
+
+# Point POWERBI_API_BASE at tools/mock_powerbi_server.py for offline work
+POWERBI_API_BASE = os.environ.get("POWERBI_API_BASE", "https://api.powerbi.com/v1.0/myorg").rstrip("/")
+API_MAX_RETRIES = int(os.environ.get("PBI_API_MAX_RETRIES", "3"))
+API_MAX_RETRY_WAIT = 30
+
+LOGO_PATH = "images/dover_log.jpg"
+STYLESHEET_PATH = "static/style.css"
+
+# Workspaces fetched in parallel by governance export jobs, and how often their progress is polled
+EXPORT_CONCURRENCY = int(os.environ.get("PBI_EXPORT_CONCURRENCY", "8"))
+EXPORT_POLL_SECONDS = 1.0
+
+# Traces with more points than this are drawn with WebGL in the browser
+WEBGL_POINT_THRESHOLD = 1000
+CHART_COLOR = "#87CEEB"
+# Hover text lists at most this many artifact names per bar segment
+HOVER_NAME_LIMIT = 10
+
+
+# Set PBI_DATA_SERVICE=host:port to query a shared data service process
+@st.cache_resource
+def get_data_service():
+    return DataServiceClient(SERVICE_ADDRESS) if SERVICE_ADDRESS else None
+
+# Inventory of one workspace; raises WorkspaceFetchError when its API calls fail
+def fetch_workspace_data(token, workspace_id, user_email, as_of=None):
+    as_of = get_analysis_date() if as_of is None else analysis_date(as_of)
+    service = get_data_service()
+    if service is not None:
+        try:
+            frames = service.call("inventory", token=token, workspace_id=workspace_id, user_email=user_email, as_of=as_of)
+        except (OSError, EOFError, RuntimeError) as e:
+            st.warning(f"⚠️ Data service unavailable, loading locally: {e}")
+        else:
+            if frames is None:
+                raise WorkspaceFetchError(f"Failed to fetch data from API for workspace {workspace_id}.")
+            return frames
+    return get_local_workspace_data(token, workspace_id, user_email, as_of)
+
+# Pages show a failed workspace as an empty one
+@timed()
+def get_cached_workspace_data(token, workspace_id, user_email, as_of=None):
+    try:
+        return fetch_workspace_data(token, workspace_id, user_email, as_of)
+    except WorkspaceFetchError as e:
+        st.error(f"❌ {e}")
+        return inventory_frames([], [], [], as_of)
 
 #Optimization: Cached API data loader
-@st.cache_data(ttl=3600)
-def get_cached_workspace_data(token, workspace_id, user_email):
-    return get_filtered_dataframes(token, workspace_id, user_email)
+@st.cache_resource
+def get_workspace_cache():
+    return WorkspaceCache()
+
+def get_local_workspace_data(token, workspace_id, user_email, as_of=None):
+    return get_workspace_cache().get_or_fetch(token, workspace_id, user_email, get_filtered_dataframes, as_of=as_of)
+
+# Cache statistics and purge go to the data service when one is configured.
+# The cache is shared by all users, so both are limited to admins.
+def workspace_cache_call(op, **kwargs):
+    user_email = st.session_state.get("user_email")
+    if not is_admin(user_email):
+        raise PermissionError("The workspace cache panel is limited to PBI_ADMIN_EMAILS.")
+    service = get_data_service()
+    if service is not None:
+        try:
+            return service.call(f"cache_{op}", user_email=user_email, **kwargs)
+        except (OSError, EOFError, RuntimeError) as e:
+            st.warning(f"⚠️ Data service unavailable, showing the local cache: {e}")
+    cache = get_workspace_cache()
+    return cache.usage() if op == "usage" else cache.purge(**kwargs)
+
+def show_cache_panel():
+    if not is_admin(st.session_state.get("user_email")):
+        return
+    usage = workspace_cache_call("usage")
+    names = {ws_id: name for name, ws_id in st.session_state.get("workspace_options", {}).items()}
+    usage.insert(1, "Name", usage["Workspace"].map(names))
+    with st.sidebar.expander("🗄️ Workspace cache"):
+        st.caption(f"{usage['Entries'].sum()} entries · {usage['Size (MB)'].sum():.1f} MB, as of the start of this run")
+        st.dataframe(usage, hide_index=True, use_container_width=True)
+        target = st.selectbox("Workspace", ["All"] + usage["Workspace"].tolist(), key="cache_purge_target",
+                              format_func=lambda ws_id: names.get(ws_id) or ws_id)
+        col1, col2 = st.columns(2)
+        if col1.button("🧹 Purge", key="cache_purge"):
+            workspace_cache_call("purge", workspace_id=None if target == "All" else target)
+            st.rerun()
+        # Refresh drops this session's workspaces so the page fetches them again
+        if col2.button("🔄 Refresh mine", key="cache_refresh"):
+            for ws_id in st.session_state.get("workspace_ids") or []:
+                workspace_cache_call("purge", workspace_id=ws_id)
+            st.rerun()
+
+# Snapshot trends are small query results, cached until new snapshots are likely
+@st.cache_data(ttl=600, show_spinner=False)
+def get_status_trend(table, status_col, start, end, workspace_ids):
+    return status_trend(table, status_col, start, end, list(workspace_ids))
+
+def get_snapshot_dates(table):
+    return snapshot_dates(table)
 
 def validate_session():
     if not (st.session_state.get("access_token") and st.session_state.get("workspace_id") and st.session_state.get("user_email")):
@@ -19,12 +134,12 @@ def show_workspace():
         st.sidebar.markdown("### 📁 Selected Workspaces:")
         for name in names:
             st.sidebar.markdown(f"- **{name}**")
+        select_analysis_date()
     else:
         st.warning("⚠️ No workspace selected.")
         st.stop()
 
-def apply_sidebar_style():
-    st.markdown("""
+SIDEBAR_CSS = """
     <style>
         [data-testid="stSidebar"] {
             background-color: #00004d;
@@ -58,7 +173,94 @@ def apply_sidebar_style():
             width: 6px;
         }
     </style>
-    """, unsafe_allow_html=True)
+"""
+
+def apply_sidebar_style():
+    st.markdown(SIDEBAR_CSS, unsafe_allow_html=True)
+
+# Static assets are read once per process instead of on every rerun
+@st.cache_resource(show_spinner=False)
+def load_asset(path, mode="r"):
+    with open(path, mode) as f:
+        return f.read()
+
+@st.cache_resource(show_spinner=False)
+def get_page_styles():
+    return SIDEBAR_CSS + f"<style>{load_asset(STYLESHEET_PATH)}</style>"
+
+# Common page bootstrap: sidebar + stylesheet injected in a single element
+def init_page():
+    page_path = sys._getframe(1).f_code.co_filename
+    if should_profile():
+        run_profiled_page(page_path)
+    # Each page run starts a fresh set of timing spans, named after the calling page
+    page = os.path.basename(page_path)
+    run = start_run(page)
+    st.markdown(get_page_styles(), unsafe_allow_html=True)
+    if show_perf_panel():
+        panel = st.sidebar.empty()
+        run.on_span = lambda r: render_perf_panel(panel, r)
+        render_perf_panel(panel, run)
+        show_cache_panel()
+
+# Admins profile a page run with ?profile=1; PBI_PROFILE=1 profiles every run
+def should_profile():
+    if profiling_active():
+        return False
+    return PROFILE_ALL_RUNS or (st.query_params.get("profile") == "1" and is_admin(st.session_state.get("user_email")))
+
+# Runs the page file again under the profiler, then ends the outer run
+def run_profiled_page(page_path):
+    profiler = PageProfiler()
+    profiler.start()
+    try:
+        runpy.run_path(page_path, run_name="__main__")
+    finally:
+        profiler.stop()
+        page = os.path.basename(page_path)
+        path, meta = profiler.save(page, profile_inputs())
+        show_profile(path, meta, profiler.summary())
+    st.stop()
+
+def profile_inputs():
+    activity_df = load_session_frame("activity_df")
+    return {
+        "workspaces": len(st.session_state.get("workspace_ids") or []),
+        "activity_rows": 0 if activity_df is None else len(activity_df),
+        "activity_mb": 0 if activity_df is None else round(activity_df.memory_usage(deep=True).sum() / 1e6, 2),
+    }
+
+def show_profile(path, meta, summary):
+    with st.sidebar:
+        st.markdown("#### 🔬 Profile")
+        st.caption(f"{meta['page']} · {meta['elapsed']:.2f}s · {meta['inputs']['activity_rows']:,} activity rows · {meta['profiler']}")
+        with open(path, "rb") as f:
+            st.download_button("⬇️ Download trace", f.read(), os.path.basename(path), key="profile_trace")
+        with st.expander("Hot spots"):
+            st.code(summary)
+
+# Admins see the panel with ?perf=1; PBI_PERF_PANEL=1 shows it to every user
+def show_perf_panel():
+    return PERF_PANEL_ENABLED or (st.query_params.get("perf") == "1" and is_admin(st.session_state.get("user_email")))
+
+def render_perf_panel(panel, run):
+    run.refreshes = getattr(run, "refreshes", 0) + 1
+    rows = [
+        {"Span": name, "Calls": s["calls"], "Total (ms)": round(s["seconds"] * 1000, 1), "Max (ms)": round(s["max"] * 1000, 1)}
+        for name, s in sorted(run.spans.items(), key=lambda item: -item[1]["seconds"])
+    ]
+    with panel.container():
+        st.markdown("#### ⏱️ Performance")
+        st.caption(f"{run.page} · {sum(s['seconds'] for s in run.spans.values()) * 1000:.0f} ms in spans")
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        # Keys change per refresh because the panel is redrawn within one run
+        st.download_button("⬇️ JSON", export_json(run), "perf.json", "application/json", key=f"perf_json_{run.refreshes}")
+        st.download_button("⬇️ Prometheus", export_prometheus(), "perf.prom", "text/plain", key=f"perf_prom_{run.refreshes}")
+
+def show_logo():
+    col1, col2, col3 = st.columns(3)
+    with col2:
+        st.image(load_asset(LOGO_PATH, "rb"))
 
 def render_profile_header():
     if st.session_state.get("logged_in"):
@@ -106,42 +308,81 @@ def render_profile_header():
             </div>
         """.replace("{email}", st.session_state.get("user_email", "")), unsafe_allow_html=True)
 
-def call_powerbi_api(url, token):
+# GET with retries on throttling (429) and temporary unavailability (503)
+def powerbi_get(url, token, params=None):
     headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        st.error(f"API call failed: {response.status_code} - {response.text}")
-        return None
+    for attempt in range(API_MAX_RETRIES + 1):
+        response = requests.get(url, headers=headers, params=params)
+        if response.status_code not in (429, 503) or attempt == API_MAX_RETRIES:
+            return response
+        retry_after = response.headers.get("Retry-After")
+        wait = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+        time.sleep(min(wait, API_MAX_RETRY_WAIT))
+
+# Follows @odata.nextLink so paged collections come back as one "value" list
+@timed()
+def call_powerbi_api(url, token, show_error=True):
+    data = None
+    while url:
+        response = powerbi_get(url, token)
+        if response.status_code != 200:
+            if show_error:
+                st.error(f"API call failed: {response.status_code} - {response.text}")
+            return None
+        with span("api_json_parse"):
+            page = response.json()
+        if data is None:
+            data = page
+        else:
+            data["value"].extend(page.get("value", []))
+        url = page.get("@odata.nextLink")
+    data.pop("@odata.nextLink", None)
+    return data
 
-def get_filtered_dataframes(token, workspace_id, user_email):
-    reports_url = f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/reports"
-    datasets_url = f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/datasets"
-    users_url = f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/users"
+@timed()
+def get_filtered_dataframes(token, workspace_id, user_email, as_of=None):
+    reports_url = f"{POWERBI_API_BASE}/groups/{workspace_id}/reports"
+    datasets_url = f"{POWERBI_API_BASE}/groups/{workspace_id}/datasets"
+    users_url = f"{POWERBI_API_BASE}/groups/{workspace_id}/users"
 
     reports_data = call_powerbi_api(reports_url, token)
     datasets_data = call_powerbi_api(datasets_url, token)
     users_data = call_powerbi_api(users_url, token)
 
-    if not (reports_data and datasets_data and users_data):
-        st.error("Failed to fetch data from API.")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    if reports_data is None or datasets_data is None or users_data is None:
+        raise WorkspaceFetchError(f"Failed to fetch data from API for workspace {workspace_id}.")
+
+    return inventory_frames(reports_data["value"], datasets_data["value"], users_data["value"], as_of)
+
+# Columns the pages read from each collection, so an empty workspace still
+# gets frames with every column
+REPORT_COLUMNS = ["id", "name", "webUrl", "datasetId"]
+DATASET_COLUMNS = ["id", "name", "configuredBy", "isRefreshable", "createdDate"]
+USER_COLUMNS = ["emailAddress", "groupUserAccessRight", "displayName"]
 
-    reports_df = pd.DataFrame(reports_data["value"])
-    datasets_df = pd.DataFrame(datasets_data["value"])
-    users_df = pd.DataFrame(users_data["value"])
+def collection_frame(values, columns):
+    df = pd.DataFrame(values)
+    for column in columns:
+        if column not in df.columns:
+            df[column] = pd.Series(dtype=object, index=df.index)
+    return df
+
+# Annotated report, dataset and user frames of one workspace's API collections
+def inventory_frames(reports, datasets, users, as_of=None):
+    reports_df = collection_frame(reports, REPORT_COLUMNS)
+    datasets_df = collection_frame(datasets, DATASET_COLUMNS)
+    users_df = collection_frame(users, USER_COLUMNS)
 
     users_df.drop(columns=['identifier'], errors='ignore', inplace=True)
     users_df.dropna(subset=['emailAddress'], inplace=True)
 
     datasets_df["createdDate"] = pd.to_datetime(datasets_df["createdDate"], errors="coerce").dt.tz_localize(None)
-    cutoff = pd.Timestamp.now() - pd.DateOffset(months=12)
+    cutoff = analysis_date(as_of) - pd.DateOffset(months=12)
     datasets_df["outdated"] = datasets_df["createdDate"] < cutoff
     datasets_df["Dataset Freshness Status"] = datasets_df.apply(
         lambda row: "Up to Date" if row["isRefreshable"] and not row["outdated"]
         else ("Needs Attention" if row["isRefreshable"] and row["outdated"]
-        else "Expired"), axis=1
+        else "Expired"), axis=1, result_type="reduce"
     )
 
     reports_df = reports_df.merge(
@@ -168,31 +409,125 @@ def get_filtered_dataframes(token, workspace_id, user_email):
             return "Up to Date"
         return "Unknown"
 
-    reports_df["Reportstatus Based on Dataset"] = reports_df.apply(classify_report, axis=1)
+    reports_df["Reportstatus Based on Dataset"] = reports_df.apply(classify_report, axis=1, result_type="reduce")
 
     return reports_df, datasets_df, users_df
 
+# Large per-session frames live in one shared, memory-budgeted store
+@st.cache_resource
+def get_session_store():
+    return SessionDataStore(int(MEMORY_BUDGET_MB * 1024 * 1024))
+
+def current_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+def store_session_frame(name, df, key=None):
+    return get_session_store().put(current_session_id(), name, df, key=key)
+
+def load_session_frame(name):
+    return get_session_store().get(current_session_id(), name)
+
+def release_session_frames(name=None):
+    get_session_store().release(current_session_id(), name)
+    service = get_data_service()
+    if service is not None and name in (None, "activity_df"):
+        try:
+            service.call("release", session_id=current_session_id())
+        except (OSError, EOFError, RuntimeError):
+            pass
+
+def show_session_memory():
+    usage = get_session_store().usage()
+    mine = usage[usage["Session"] == current_session_id()]
+    if not mine.empty:
+        row = mine.iloc[0]
+        st.sidebar.caption(f"🧠 Session data: {row['In Memory (MB)']} MB in memory, {row['Spilled (MB)']} MB on disk")
+
 # Shared utility to handle activity file upload
 def handle_activity_upload():
-    if "activity_df" not in st.session_state:
+    # Frames placed directly in session_state are ingested like an upload
+    legacy_df = st.session_state.pop("activity_df", None)
+    if isinstance(legacy_df, pd.DataFrame):
+        legacy_key = frame_key(legacy_df)
+        store = ActivityStore.ingest(legacy_key, iter_frame_chunks(legacy_df))
+        st.session_state["activity_key"] = store_session_frame("activity_df", store.rollup(), key=legacy_key)
+
+    # Sessions hold the activity store's daily rollup; raw events stay on disk
+    activity_df = load_session_frame("activity_df")
+    if activity_df is None:
         uploaded_file = st.file_uploader("📄 Upload Activity CSV", type=["csv"])
         if uploaded_file:
-            df = pd.read_csv(uploaded_file)
-            df["Activity time"] = pd.to_datetime(df["Activity time"], errors="coerce")
-            st.session_state["activity_df"] = df
+            # Identical uploads from different sessions share one store
+            upload_key = hashlib.sha1(uploaded_file.getvalue()).hexdigest()
+            with span("csv_ingest"):
+                try:
+                    store = ActivityStore.ingest(upload_key, read_activity_chunks(uploaded_file))
+                except Exception as e:
+                    st.error(f"❌ Failed to read file: {e}")
+                    st.stop()
+            st.session_state["activity_key"] = store_session_frame("activity_df", store.rollup(), key=upload_key)
             st.session_state["activity_filename"] = uploaded_file.name
             st.rerun()
         else:
             st.warning("Please upload an activity CSV file to proceed.")
             st.stop()
     else:
-        st.success(f"✅ Uploaded: {st.session_state['activity_filename']}")
+        st.success(f"✅ Uploaded: {st.session_state.get('activity_filename')}")
+        store = get_activity_store()
+        if store is not None and not store.exists():
+            st.warning("⚠️ The stored activity log was cleaned up, so raw event views are empty. Reset and upload the file again.")
+        show_session_memory()
+        append_activity_upload()
         if st.button("🔄 Reset Activity CSV"):
-            del st.session_state["activity_df"]
-            del st.session_state["activity_filename"]
+            release_session_frames("activity_df")
+            st.session_state.pop("activity_filename", None)
+            st.session_state.pop("activity_key", None)
             st.rerun()
 
-    return st.session_state["activity_df"]
+    return activity_df
+
+# Adds a file of newer events to the session's activity store. Only the new
+# file is parsed; events already stored are skipped by their event key.
+def append_activity_upload():
+    message = st.session_state.pop("activity_append_message", None)
+    if message:
+        st.info(message)
+    # A fresh widget key clears the uploader once its file is appended
+    upload_round = st.session_state.get("activity_append_round", 0)
+    new_file = st.file_uploader("➕ Append new activity events", type=["csv"], key=f"activity_append_{upload_round}")
+    if not new_file:
+        return
+    store = get_activity_store()
+    if store is None or not store.exists():
+        st.warning("⚠️ The stored activity log has expired. Reset and upload the full file again.")
+        return
+    append_key = hashlib.sha1((store.key + hashlib.sha1(new_file.getvalue()).hexdigest()).encode()).hexdigest()
+    with span("csv_append"):
+        try:
+            store = store.append(append_key, read_activity_chunks(new_file))
+        except Exception as e:
+            st.error(f"❌ Failed to read file: {e}")
+            st.stop()
+    meta = store.meta()
+    st.session_state["activity_key"] = store_session_frame("activity_df", store.rollup(), key=append_key)
+    st.session_state["activity_filename"] = f"{st.session_state.get('activity_filename')} + {new_file.name}"
+    st.session_state["activity_append_round"] = upload_round + 1
+    st.session_state["activity_append_message"] = (
+        f"➕ Appended {meta['added']:,} new events from {new_file.name}; "
+        f"{meta['duplicates']:,} already stored were skipped."
+    )
+    st.rerun()
+
+# Raw events of the session's upload, for the log views. Getting the store
+# marks it as in use, so it is not pruned while the session is active.
+def get_activity_store():
+    key = st.session_state.get("activity_key")
+    if not key:
+        return None
+    store = ActivityStore(key)
+    store.touch()
+    return store
 
 def add_logout_button():
     with st.sidebar:
@@ -215,52 +550,397 @@ def add_logout_button():
 
         if st.session_state.get("access_token"):
             if st.button("🚪 Logout"):
+                release_session_frames()
                 for key in [
                     "access_token", "user_email", "workspace_ids",
                     "workspace_names", "logged_in", "workspace_options",
-                    "activity_df", "activity_filename", "activity_csv"
+                    "activity_df", "activity_filename", "activity_csv", "activity_key",
+                    "analysis_date", "export_job"
                 ]:
                     st.session_state.pop(key, None)
 
 
-# Annotate activity status on reports, datasets, users
-def apply_activity_status(activity_df, reports_df, datasets_df, users_df):
+# Annotate activity status on reports, datasets, users.
+# window: days back from the analysis date, or a start date; last_seen: a
+# LastSeen built once for this activity log and date, so changing the window
+# does not rescan it; as_of: the analysis date, today by default.
+@timed()
+# Activity on the workspaces' reports and datasets up to the analysis date
+def workspace_activity(activity_df, reports_df, datasets_df, as_of=None):
     activity_df["Activity time"] = pd.to_datetime(activity_df["Activity time"], errors="coerce")
-    activity_df = activity_df.sort_values("Activity time")
-
     workspace_artifact_ids = set(reports_df["id"]).union(set(datasets_df["id"]))
     activity_df = activity_df[activity_df["ArtifactId"].isin(workspace_artifact_ids)]
+    return activity_until(activity_df, analysis_date(as_of))
 
-    cutoff_date = pd.Timestamp.now() - pd.DateOffset(months=3)
+def apply_activity_status(activity_df, reports_df, datasets_df, users_df, window=DEFAULT_ACTIVITY_WINDOW, last_seen=None, as_of=None):
+    as_of = analysis_date(as_of)
+    activity_df = workspace_activity(activity_df, reports_df, datasets_df, as_of)
+    workspace_artifact_ids = set(reports_df["id"]).union(set(datasets_df["id"]))
 
-    latest_access = activity_df.drop_duplicates(subset="Artifact Name", keep="last")
-    latest_access = latest_access.rename(columns={"Activity time": "Latest Activity"})
+    start = window_start(window, as_of)
+    artifact_latest, user_latest_activity = (last_seen or LastSeen(activity_df, as_of)).for_artifacts(workspace_artifact_ids)
 
-    artifact_activity_map = dict(zip(latest_access["ArtifactId"], latest_access["Latest Activity"]))
+    # One row per artifact: artifacts sharing a name are listed separately
+    latest_access = (
+        artifact_latest.rename(columns={"Activity time": "Latest Activity"})
+        .sort_values("Latest Activity", ascending=False, na_position="last", kind="stable")
+    )
+    artifact_activity = latest_access.set_index("ArtifactId")["Latest Activity"]
 
-    recent_user_activity = activity_df[activity_df["Activity time"] >= cutoff_date]
-    recent_users = recent_user_activity["User email"].dropna().unique()
-    recent_artifacts = latest_access["ArtifactId"].unique()
+    # reindex instead of map: mapping through an empty datetime Series fails
+    # in pandas 3, and an analysis date before any activity leaves it empty
+    user_latest = pd.Series(user_latest_activity.reindex(users_df["emailAddress"]).to_numpy(), index=users_df.index)
+    users_df["activityStatus"] = status_since(user_latest, start)
+    users_df["Latest Activity Time"] = user_latest
 
-    users_df["activityStatus"] = users_df["emailAddress"].apply(
-        lambda x: "Active" if x in recent_users else "Inactive"
-    )
+    report_latest = pd.Series(artifact_activity.reindex(reports_df["id"]).to_numpy(), index=reports_df.index)
+    reports_df["Activity Status"] = status_since(report_latest, start)
+    reports_df["Latest Artifact Activity"] = report_latest
 
-    user_latest_activity = (
-        activity_df.sort_values("Activity time")
-        .drop_duplicates(subset="User email", keep="last")
-        .set_index("User email")["Activity time"]
-    )
-    users_df["Latest Activity Time"] = users_df["emailAddress"].map(user_latest_activity)
+    dataset_latest = pd.Series(artifact_activity.reindex(datasets_df["id"]).to_numpy(), index=datasets_df.index)
+    datasets_df["Activity Status"] = status_since(dataset_latest, start)
+    datasets_df["Latest Artifact Activity"] = dataset_latest
+
+    return activity_df, reports_df, datasets_df, users_df, latest_access
 
-    reports_df["Activity Status"] = reports_df["id"].apply(
-        lambda x: "Active" if x in recent_artifacts else "Inactive"
+
+# Last-seen tables are built once per activity log and analysis date and shared by sessions.
+# Stored logs keep them up to date on ingest, so only past analysis dates rescan the log.
+@st.cache_resource(max_entries=16)
+def get_last_seen(key, as_of, _activity_df):
+    store = ActivityStore(key)
+    last_seen = store.last_seen(as_of) if store.exists() else None
+    return LastSeen(_activity_df, as_of) if last_seen is None else last_seen
+
+# The analysis date picked in the sidebar, or today
+def get_analysis_date():
+    return analysis_date(st.session_state.get("analysis_date"))
+
+# Sidebar date the pages are computed as of. It is kept outside the widget
+# state so it survives page switches, and only when it is not today, so an
+# open session moves on to the next day by itself.
+def store_analysis_date():
+    picked = st.session_state["analysis_date_picker"]
+    st.session_state["analysis_date"] = None if picked == analysis_date().date() else picked
+
+def select_analysis_date():
+    st.session_state["analysis_date_picker"] = get_analysis_date().date()
+    st.sidebar.date_input("📅 Analysis date", max_value=analysis_date().date(),
+                          key="analysis_date_picker", on_change=store_analysis_date)
+
+# Activity window picker shared by the activity pages; returns the window and its label
+def select_activity_window():
+    options = list(ACTIVITY_WINDOWS) + ["Since a date"]
+    default = next(label for label, days in ACTIVITY_WINDOWS.items() if days == DEFAULT_ACTIVITY_WINDOW)
+    choice = st.sidebar.selectbox("🕒 Active within", options, index=options.index(default), key="activity_window")
+    if choice == "Since a date":
+        since = st.sidebar.date_input("📅 Active since", value=window_start(as_of=get_analysis_date()).date(), key="activity_since")
+        return pd.Timestamp(since), f"since {since:%d %b %Y}"
+    return ACTIVITY_WINDOWS[choice], choice
+
+# Format of the download buttons that follow it
+def select_export_format(key, rows=0):
+    return st.selectbox("💾 Download format", available_formats(rows), key=key)
+
+# Download button that writes its file only when clicked. `filters` must
+# identify the rows, since the file is cached under their hash; `df` may be
+# a callable returning the frame. Clicking does not rerun the page.
+def export_button(df, filters, file_stem, fmt, label="📥 Download", key=None):
+    extension, mime = EXPORT_FORMATS[fmt]
+    st.download_button(
+        label=f"{label} {fmt}",
+        data=lambda: export_bytes(df, filters, fmt),
+        file_name=f"{file_stem}{extension}",
+        mime=mime,
+        key=key,
+        on_click="ignore",
     )
-    reports_df["Latest Artifact Activity"] = reports_df["id"].map(artifact_activity_map)
 
-    datasets_df["Activity Status"] = datasets_df["id"].apply(
-        lambda x: "Active" if x in recent_artifacts else "Inactive"
+# Table that sends one page of rows to the browser. fetch is a page source
+# (see paging.py), so the filter and sort run on the server; `key` prefixes
+# the widget keys. Changing the filter or sort goes back to the first page.
+def show_paged_table(fetch, columns, key, sort=None, descending=False, page_rows=PAGE_ROWS):
+    page_key = f"{key}_page"
+    first_page = lambda: st.session_state.update({page_key: 1})
+    col1, col2, col3 = st.columns([3, 2, 1])
+    search = col1.text_input("🔎 Filter rows", key=f"{key}_search", on_change=first_page)
+    sort = col2.selectbox("Sort by", columns, index=columns.index(sort) if sort in columns else 0,
+                          key=f"{key}_sort", on_change=first_page)
+    descending = col3.toggle("Descending", value=descending, key=f"{key}_descending", on_change=first_page)
+
+    page = st.session_state.get(page_key, 1)
+    rows, total = fetch(sort, descending, search, (page - 1) * page_rows, page_rows)
+    pages = max(1, -(-total // page_rows))
+    # Fewer rows than before, e.g. after switching workspaces
+    if page > pages:
+        page = st.session_state[page_key] = pages
+        rows, total = fetch(sort, descending, search, (page - 1) * page_rows, page_rows)
+    first = (page - 1) * page_rows
+    rows = rows[columns].set_axis(pd.RangeIndex(first + 1, first + len(rows) + 1))
+    st.dataframe(rows, use_container_width=True)
+    col1, col2 = st.columns([1, 3])
+    col1.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    col2.caption(f"Rows {first + 1 if total else 0:,}–{first + len(rows):,} of {total:,}, page {page:,} of {pages:,}.")
+
+# Paged table over a frame held by the server
+def show_frame_table(df, columns, key, sort=None, descending=False):
+    show_paged_table(lambda *args: frame_page(df[columns], *args), columns, key, sort, descending)
+
+# Background export jobs are shared by all sessions of this server
+@st.cache_resource
+def get_export_jobs():
+    return ExportJobs()
+
+# Starts a job that bundles the annotated inventory of every workspace the
+# user can see, with activity status when an activity log is loaded
+def start_governance_export(fmt):
+    from governance_report import fetch_inventory, build_outputs
+
+    token, email = st.session_state.access_token, st.session_state.user_email
+    workspaces = [{"id": ws_id, "name": name} for name, ws_id in st.session_state.workspace_options.items()]
+    as_of = get_analysis_date()
+    store = get_activity_store()
+
+    def build(report):
+        def fetched(done, total, failed):
+            report(0.7 * done / total, f"Fetched {done:,} of {total:,} workspaces ({failed:,} failed)")
+
+        reports_df, datasets_df, users_df, failed = fetch_inventory(
+            token, workspaces, email, EXPORT_CONCURRENCY, as_of, fetch=fetch_workspace_data, progress=fetched
+        )
+        if reports_df.empty:
+            raise RuntimeError("No workspace data could be fetched.")
+        activity_df = last_seen = None
+        if store is not None and store.exists():
+            report(0.75, "Annotating activity status")
+            activity_df, last_seen = store.rollup(), store.last_seen(as_of)
+        tables = build_outputs(reports_df, datasets_df, users_df, activity_df, as_of=as_of, last_seen=last_seen)
+        if failed:
+            tables["failed_workspaces"] = pd.DataFrame(failed)
+        return tables
+
+    return get_export_jobs().submit(build, fmt, f"governance_{as_of:%Y-%m-%d}")
+
+# Progress of the session's export job; polls while it runs and serves the
+# finished file from disk
+def show_export_job(job_id):
+    job = get_export_jobs().get(job_id)
+    if job is None:
+        return
+    if job["status"] in ("queued", "running"):
+        st.progress(job["progress"], text=job["message"])
+    elif job["status"] == "failed":
+        st.error(f"❌ Export failed: {job['error']}")
+    elif os.path.exists(job["path"]):
+        st.success(f"✅ {job['file_name']} is ready ({os.path.getsize(job['path']) / 1e6:,.1f} MB).")
+        st.download_button(
+            "📥 Download bundle", data=lambda: open(job["path"], "rb"), file_name=job["file_name"],
+            mime=job["mime"], key=f"bundle_{job_id}", on_click="ignore",
+        )
+    else:
+        st.warning("⚠️ The export file has been cleaned up. Please start a new export.")
+
+def show_governance_export():
+    st.subheader("📦 Governance Export")
+    st.caption(
+        "Reports, datasets and users of all your workspaces with freshness and activity status, "
+        f"as of {get_analysis_date():%d %b %Y}, in one file. The bundle is built in the background."
+    )
+    job_id = st.session_state.get("export_job")
+    job = get_export_jobs().get(job_id) if job_id else None
+    running = job is not None and job["status"] in ("queued", "running")
+    col1, col2 = st.columns([3, 1])
+    fmt = col1.selectbox("Bundle format", bundle_formats(), key="bundle_format")
+    if col2.button("🚀 Start export", disabled=running):
+        job_id = st.session_state.export_job = start_governance_export(fmt)
+        running = True
+    if job_id:
+        if running:
+            # Reruns only this block while the job runs; the whole page reruns once it ends
+            @st.fragment(run_every=EXPORT_POLL_SECONDS)
+            def poll():
+                show_export_job(job_id)
+                job = get_export_jobs().get(job_id)
+                if job is None or job["status"] not in ("queued", "running"):
+                    st.rerun()
+
+            poll()
+        else:
+            show_export_job(job_id)
+
+# Aggregations over the activity log run in DuckDB when it is installed.
+# Engines are cached per log, analysis date and scope (the artifacts the
+# frame was filtered to), so reruns reuse the connection and its registered
+# frame; evicted engines close their connection.
+@st.cache_resource(max_entries=16, show_spinner=False, on_release=lambda engine: engine.close())
+def load_activity_engine(key, as_of, scope, _activity_df, _hitters):
+    return ActivityEngine(_activity_df, hitters=_hitters)
+
+def get_activity_engine(activity_df, hitters=None, scope=()):
+    key = st.session_state.get("activity_key") or frame_key(activity_df)
+    return load_activity_engine(key, get_analysis_date(), tuple(sorted(map(str, scope))), activity_df, hitters)
+
+# Per-day top-K summaries of an activity store, up to the analysis date
+@st.cache_resource(max_entries=16)
+def load_heavy_hitters(key, as_of):
+    store = ActivityStore(key)
+    return HeavyHitters(store.top_summary(), until=as_of) if store.exists() else None
+
+def get_heavy_hitters(as_of=None):
+    key = st.session_state.get("activity_key")
+    return load_heavy_hitters(key, get_analysis_date() if as_of is None else analysis_date(as_of)) if key else None
+
+# Distinct-user sketches of an activity store, up to the analysis date
+@st.cache_resource(max_entries=16)
+def load_distinct_users(key, as_of):
+    store = ActivityStore(key)
+    return DistinctUsers(store.user_sketch(), until=as_of) if store.exists() else None
+
+def get_distinct_users(as_of=None):
+    key = st.session_state.get("activity_key")
+    return load_distinct_users(key, get_analysis_date() if as_of is None else analysis_date(as_of)) if key else None
+
+# Estimated distinct users of each artifact in `ids` since `start`, aligned to ids
+def distinct_users_since(ids, start):
+    distinct = get_distinct_users()
+    if distinct is None:
+        return None
+    counts = distinct.count("ArtifactId", ids.dropna().unique(), since=start)
+    return pd.Series(counts.reindex(ids).fillna(0).astype("int64").to_numpy(), index=ids.index)
+
+# Reports and datasets with no access in the activity, or none since `since`.
+# Inventory IDs are anti-joined against the set of accessed ArtifactIds, so
+# artifacts sharing a name are told apart; the result is a cleanup list.
+@timed()
+def find_unused_artifacts(activity_df, reports_df, datasets_df, since=None):
+    if since is not None:
+        activity_df = activity_df[activity_df["Activity time"] >= since]
+    # A hash index of the accessed IDs; probing it is much faster than
+    # Series.isin on Arrow-backed strings
+    accessed = pd.Index(activity_df["ArtifactId"].dropna().unique())
+    inventory = pd.concat([
+        reports_df.assign(**{"Artifact Type": "Report"}),
+        datasets_df.assign(**{"Artifact Type": "Dataset"}),
+    ], ignore_index=True)
+    unused = inventory[accessed.get_indexer(inventory["id"]) < 0]
+    columns = {
+        "Artifact Type": "Artifact Type", "id": "Artifact ID", "name": "Artifact Name",
+        "workspace_name": "Workspace", "Latest Artifact Activity": "Latest Activity",
+    }
+    return unused[[c for c in columns if c in unused.columns]].rename(columns=columns).reset_index(drop=True)
+
+
+# Activity status through the data service when configured, otherwise in-process
+@timed()
+def compute_activity_status(activity_df, reports_df, datasets_df, users_df, window=DEFAULT_ACTIVITY_WINDOW, as_of=None):
+    as_of = get_analysis_date() if as_of is None else analysis_date(as_of)
+    service = get_data_service()
+    key = st.session_state.get("activity_key") or frame_key(activity_df)
+    if service is not None:
+        session_id = current_session_id()
+        try:
+            if not service.call("has_activity", session_id=session_id, key=key):
+                service.call("put_activity", session_id=session_id, key=key, df=activity_df)
+            # The service returns the annotated inventory only; the session
+            # already holds the activity frame and filters it here
+            reports_df, datasets_df, users_df, latest_access = service.call(
+                "activity_status", session_id=session_id, key=key, window=window, as_of=as_of,
+                reports_df=reports_df, datasets_df=datasets_df, users_df=users_df
+            )
+            activity_df = workspace_activity(activity_df, reports_df, datasets_df, as_of)
+            return activity_df, reports_df, datasets_df, users_df, latest_access
+        except (OSError, EOFError, RuntimeError) as e:
+            st.warning(f"⚠️ Data service unavailable, computing locally: {e}")
+    return apply_activity_status(
+        activity_df, reports_df, datasets_df, users_df, window=window,
+        last_seen=get_last_seen(key, as_of, activity_df), as_of=as_of
     )
-    datasets_df["Latest Artifact Activity"] = datasets_df["id"].map(artifact_activity_map)
 
-    return activity_df, reports_df, datasets_df, users_df, latest_access
+
+# Shared chart layer: pages pass small aggregated frames, Plotly renders them client-side.
+# plotly is imported on first use so pages that never draw a chart skip the import.
+def show_chart(fig):
+    with span("show_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+@timed()
+def plot_bar(data, x, y, title=None, orientation="v", color=None, color_map=None, tickangle=None,
+             text_position=None, **kwargs):
+    import plotly.express as px
+    fig = px.bar(
+        data, x=x, y=y, title=title, orientation=orientation,
+        color=color, color_discrete_map=color_map, **kwargs
+    )
+    if color is None:
+        fig.update_traces(marker_color=CHART_COLOR)
+    if orientation == "h":
+        fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    if tickangle is not None:
+        fig.update_layout(xaxis_tickangle=tickangle)
+    if text_position is not None:
+        fig.update_traces(textposition=text_position)
+    show_chart(fig)
+
+@timed()
+def plot_line(data, x, y, title=None, color="orange", text_position=None, **kwargs):
+    import plotly.express as px
+    render_mode = "webgl" if len(data) > WEBGL_POINT_THRESHOLD else "svg"
+    fig = px.line(data, x=x, y=y, title=title, markers=True, render_mode=render_mode, **kwargs)
+    if color is not None:
+        fig.update_traces(line_color=color)
+    if text_position is not None:
+        fig.update_traces(textposition=text_position)
+    show_chart(fig)
+
+@timed()
+def plot_pie(counts, label, title=None, color_map=None, hole=0.0):
+    import plotly.express as px
+    counts = counts.rename_axis(label).reset_index(name="Count")
+    fig = px.pie(
+        counts, values="Count", names=label, title=title, hole=hole,
+        color=label, color_discrete_map=color_map or {}
+    )
+    fig.update_traces(textinfo="percent+label")
+    show_chart(fig)
+
+@timed()
+def plot_treemap(data, path, values, title=None, color_scale="Blues"):
+    import plotly.express as px
+    fig = px.treemap(data, path=path, values=values, color=values, color_continuous_scale=color_scale, title=title)
+    show_chart(fig)
+
+@timed()
+def plot_heatmap(matrix, title=None, color_scale="YlGnBu"):
+    import plotly.express as px
+    fig = px.imshow(matrix, aspect="auto", color_continuous_scale=color_scale, title=title)
+    fig.update_layout(height=max(400, len(matrix) * 18))
+    fig.update_xaxes(tickangle=-45)
+    show_chart(fig)
+
+# Counts per group plus a short name sample for hover text; the full name lists
+# stay on the server and are only sent through show_name_drilldown
+def summarize_names(df, group_cols, name_col="name", label="Names", limit=HOVER_NAME_LIMIT):
+    summary = df.groupby(group_cols).size().reset_index(name="Count")
+    sample = (
+        df.groupby(group_cols).head(limit)
+        .groupby(group_cols)[name_col]
+        .agg(lambda names: "<br>".join(names.astype(str)))
+        .reset_index(name=label)
+    )
+    summary = summary.merge(sample, on=group_cols, how="left")
+    hidden = summary["Count"] - limit
+    summary.loc[hidden > 0, label] += "<br>… and " + hidden[hidden > 0].astype(str) + " more"
+    return summary
+
+def show_name_drilldown(df, group_cols, name_col="name", key="drilldown", label="🔎 Drill down into names"):
+    section = st.expander(label, key=f"{key}_section", on_change="rerun")
+    if not section.open:
+        return
+    with section:
+        selected = df
+        cols = st.columns(len(group_cols))
+        for col, group_col in zip(cols, group_cols):
+            options = sorted(selected[group_col].dropna().unique().tolist())
+            choice = col.selectbox(group_col, options, key=f"{key}_{group_col}")
+            selected = selected[selected[group_col] == choice]
+        st.dataframe(selected[[name_col]].reset_index(drop=True), use_container_width=True)
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+WORKSPACE_CACHE_TTL_SECONDS = int(os.environ.get("PBI_WORKSPACE_CACHE_TTL", "3600"))
+WORKSPACE_CACHE_MB = float(os.environ.get("PBI_WORKSPACE_CACHE_MB", "256"))
+
+
+# Raised by a fetch when a workspace's API calls fail. A workspace that
+# simply has no reports, datasets or users is not a failure.
+class WorkspaceFetchError(Exception):
+    pass
+
+
+def token_hash(token):
+    return hashlib.sha1(token.encode()).hexdigest()[:12]
+
+
+# Workspace inventory cache with per-workspace statistics.
+# Entries are keyed by (token hash, workspace, user email, analysis date),
+# since the freshness classification depends on the date. When a user's
+# token is refreshed, the copies fetched with older tokens are dropped, and
+# the least recently used entries are evicted beyond the memory budget.
+class WorkspaceCache:
+    def __init__(self, ttl_seconds=WORKSPACE_CACHE_TTL_SECONDS, budget_bytes=int(WORKSPACE_CACHE_MB * 1024 * 1024)):
+        self.ttl_seconds = ttl_seconds
+        self.budget_bytes = budget_bytes
+        self.lock = threading.Lock()
+        self.fetch_locks = {}
+        self.entries = {}
+        self.stats = {}
+
+    def get_or_fetch(self, token, workspace_id, user_email, fetch, as_of=None):
+        key = (token_hash(token), workspace_id, user_email, as_of)
+        with self.lock:
+            fetch_lock = self.fetch_locks.setdefault(key, threading.Lock())
+        # Concurrent requests for the same entry wait for a single fetch
+        try:
+            with fetch_lock:
+                with self.lock:
+                    entry = self.entries.get(key)
+                    if entry is not None and time.time() - entry["fetched_at"] > self.ttl_seconds:
+                        self._drop(key, "expired")
+                        entry = None
+                    if entry is not None:
+                        entry["hits"] += 1
+                        entry["last_used"] = time.time()
+                        self._stats(workspace_id)["hits"] += 1
+                        return tuple(df.copy(deep=False) for df in entry["frames"])
+                    self._stats(workspace_id)["misses"] += 1
+
+                # Empty workspaces are cached like any other
+                frames = fetch(token, workspace_id, user_email, as_of)
+                with self.lock:
+                    for other in [k for k in self.entries if k[1:] == key[1:] and k != key]:
+                        self._drop(other, "superseded")
+                    now = time.time()
+                    self.entries[key] = {
+                        "frames": frames,
+                        "bytes": sum(int(df.memory_usage(deep=True).sum()) for df in frames),
+                        "fetched_at": now,
+                        "last_used": now,
+                        "hits": 0,
+                    }
+                    self._enforce_budget(keep=key)
+        except Exception:
+            # Failed fetches raise (see WorkspaceFetchError) and are not cached
+            with self.lock:
+                self._forget_lock(key)
+            raise
+        return tuple(df.copy(deep=False) for df in frames)
+
+    def purge(self, workspace_id=None):
+        with self.lock:
+            keys = [k for k in self.entries if workspace_id is None or k[1] == workspace_id]
+            for key in keys:
+                self._drop(key, "purged")
+            self.fetch_locks = {k: v for k, v in self.fetch_locks.items() if v.locked() or k in self.entries}
+        return len(keys)
+
+    def memory_bytes(self):
+        return sum(e["bytes"] for e in self.entries.values())
+
+    def usage(self):
+        now = time.time()
+        rows = []
+        with self.lock:
+            for workspace_id, stats in self.stats.items():
+                entries = [e for k, e in self.entries.items() if k[1] == workspace_id]
+                lookups = stats["hits"] + stats["misses"]
+                rows.append({
+                    "Workspace": workspace_id,
+                    "Entries": len(entries),
+                    "Token Copies": len({k[0] for k in self.entries if k[1] == workspace_id}),
+                    "Size (MB)": round(sum(e["bytes"] for e in entries) / 1e6, 2),
+                    "Oldest (s)": int(max((now - e["fetched_at"] for e in entries), default=0)),
+                    "Hits": stats["hits"],
+                    "Misses": stats["misses"],
+                    "Hit Rate": round(stats["hits"] / lookups, 2) if lookups else None,
+                    "Evictions": stats["evicted"] + stats["superseded"],
+                    "Expired": stats["expired"],
+                })
+        return pd.DataFrame(rows, columns=[
+            "Workspace", "Entries", "Token Copies", "Size (MB)", "Oldest (s)",
+            "Hits", "Misses", "Hit Rate", "Evictions", "Expired",
+        ])
+
+    def _stats(self, workspace_id):
+        return self.stats.setdefault(
+            workspace_id, {"hits": 0, "misses": 0, "evicted": 0, "superseded": 0, "expired": 0, "purged": 0}
+        )
+
+    def _drop(self, key, reason):
+        self.entries.pop(key, None)
+        self._forget_lock(key)
+        self._stats(key[1])[reason] += 1
+
+    # Fetch locks live as long as their entry, unless a fetch holds them
+    def _forget_lock(self, key):
+        lock = self.fetch_locks.get(key)
+        if lock is not None and not lock.locked() and key not in self.entries:
+            del self.fetch_locks[key]
+
+    def _enforce_budget(self, keep=None):
+        for key in sorted((k for k in self.entries if k != keep), key=lambda k: self.entries[k]["last_used"]):
+            if self.memory_bytes() <= self.budget_bytes:
+                break
+            self._drop(key, "evicted")
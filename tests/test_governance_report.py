@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "App"))
+
+import governance_report
+import utils
+
+REPORT = {"id": "r1", "name": "Sales", "webUrl": "https://example.com/r1", "datasetId": "d1"}
+DATASET = {"id": "d1", "name": "Sales", "configuredBy": "a@corp.com", "isRefreshable": True,
+           "createdDate": "2020-01-01T00:00:00Z"}
+USER = {"emailAddress": "a@corp.com", "groupUserAccessRight": "Admin", "displayName": "A"}
+
+
+def fake_api(collections):
+    def call(url, token, show_error=True):
+        values = collections.get(url.rsplit("/", 1)[-1])
+        return None if values is None else {"value": values}
+    return call
+
+
+def test_empty_workspace_is_not_a_failure(monkeypatch):
+    monkeypatch.setattr(utils, "call_powerbi_api", fake_api({"reports": [], "datasets": [DATASET], "users": [USER]}))
+    workspaces = [{"id": "ws1", "name": "Empty"}, {"id": "ws2", "name": "Also empty"}]
+    reports, datasets, users, failed = governance_report.fetch_inventory("token", workspaces, "a@corp.com", 2)
+    assert failed == []
+    assert reports.empty and "Reportstatus Based on Dataset" in reports.columns
+    assert len(datasets) == 2 and len(users) == 2
+    outputs = governance_report.build_outputs(reports, datasets, users)
+    assert outputs["stale_reports"].empty
+
+
+def test_failed_api_call_is_reported(monkeypatch):
+    monkeypatch.setattr(utils, "call_powerbi_api", fake_api({"reports": [REPORT], "datasets": None, "users": [USER]}))
+    reports, datasets, users, failed = governance_report.fetch_inventory(
+        "token", [{"id": "ws1", "name": "Broken"}], "a@corp.com", 1
+    )
+    assert [f["workspace_id"] for f in failed] == ["ws1"]
+    assert "WorkspaceFetchError" in failed[0]["error"]
@@ -0,0 +1,93 @@
+"""Cold and warm page-load times for every Streamlit page.
+
+Each page is run in a fresh interpreter: the first run is the cold load
+(module imports, asset reads, cache fills) and the following runs in the
+same process are warm reruns. Power BI API calls are answered from the
+data/*.json fixtures and the bundled sample activity CSV is pre-loaded.
+
+    python tools/bench_page_load.py --runs 5
+    python tools/bench_page_load.py 1_Reports.py 4_Activity_Analysis.py
+"""
+import time
+
+PROCESS_START = time.perf_counter()
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from fixtures import APP_DIR, WORKSPACE_ID, WORKSPACE_NAME, install_fixture_api, sample_activity
+
+
+def run_page(page, runs):
+    from streamlit.testing.v1 import AppTest
+
+    install_fixture_api()
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+    activity_df = sample_activity()
+
+    timings, errors = [], []
+    for i in range(runs):
+        at = AppTest.from_file(os.path.join(APP_DIR, "pages", page), default_timeout=300)
+        at.session_state["access_token"] = "fixture-token"
+        at.session_state["user_email"] = "bench@example.com"
+        at.session_state["logged_in"] = True
+        at.session_state["workspace_ids"] = [WORKSPACE_ID]
+        at.session_state["workspace_names"] = [WORKSPACE_NAME]
+        at.session_state["workspace_options"] = {WORKSPACE_NAME: WORKSPACE_ID}
+        at.session_state["activity_df"] = activity_df.copy()
+        at.session_state["activity_filename"] = "data.csv"
+        start = time.perf_counter()
+        at.run()
+        end = time.perf_counter()
+        # The cold run also pays for interpreter-level imports done before it
+        timings.append(end - (PROCESS_START if i == 0 else start))
+        errors.extend(e.message for e in at.exception)
+    return {"page": page, "cold": timings[0], "warm": timings[1:], "errors": errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold and warm page loads.")
+    parser.add_argument("pages", nargs="*", help="page files under App/pages (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="runs per page, the first one is cold")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_page(args.child, max(args.runs, 1))))
+        return
+
+    pages = args.pages or sorted(p for p in os.listdir(os.path.join(APP_DIR, "pages")) if p.endswith(".py"))
+    results = []
+    for page in pages:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", page, "--runs", str(args.runs)],
+            capture_output=True, text=True,
+        )
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode != 0 or not lines:
+            results.append({"page": page, "cold": None, "warm": [], "errors": [proc.stderr.strip()[-500:]]})
+            continue
+        results.append(json.loads(lines[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'page':<36} {'cold (s)':>10} {'warm median (s)':>16} {'warm min (s)':>13}")
+    for r in results:
+        cold = f"{r['cold']:.3f}" if r["cold"] is not None else "failed"
+        warm_median = f"{statistics.median(r['warm']):.3f}" if r["warm"] else "-"
+        warm_min = f"{min(r['warm']):.3f}" if r["warm"] else "-"
+        print(f"{r['page']:<36} {cold:>10} {warm_median:>16} {warm_min:>13}")
+        for error in r["errors"]:
+            print(f"    ! {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Time and peak memory of each data pipeline stage at tenant scale.
+
+A tenant from tools/synthetic_tenant.py is served through a mocked Power
+BI API, so get_filtered_dataframes, apply_activity_status and the page
+aggregations run unchanged.
+
+    python tools/bench_pipeline.py --scale small
+    python tools/bench_pipeline.py --scale full --save bench.json
+    python tools/bench_pipeline.py --scale medium --baseline bench.json
+    python tools/bench_pipeline.py --tenant out/tenant
+
+With --baseline the run exits non-zero when a stage got slower than the
+baseline by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from fixtures import APP_DIR, install_fixture_api
+from synthetic_tenant import load_tenant, write_tenant
+
+sys.path.insert(0, APP_DIR)
+
+SCALES = {
+    "small": {"workspaces": 50, "artifacts": 1_000, "events": 100_000},
+    "medium": {"workspaces": 1_000, "artifacts": 10_000, "events": 1_000_000},
+    "full": {"workspaces": 10_000, "artifacts": 100_000, "events": 10_000_000},
+}
+# Above this many user x artifact cells the heatmap stage is skipped
+HEATMAP_CELL_LIMIT = 5_000_000
+
+
+class StageRecorder:
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.results = []
+
+    def run(self, name, func, *args, **kwargs):
+        if self.track_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        peak = None
+        if self.track_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.results.append({"stage": name, "seconds": elapsed, "peak_mb": peak / 1e6 if peak is not None else None})
+        return result
+
+
+def fetch_inventory(workspace_list):
+    from utils import get_filtered_dataframes
+
+    reports_list, datasets_list, users_list = [], [], []
+    for ws in workspace_list:
+        reports, datasets, users = get_filtered_dataframes("bench-token", ws["id"], "bench@example.com")
+        for df in (reports, datasets, users):
+            df["workspace_id"] = ws["id"]
+            df["workspace_name"] = ws["name"]
+        reports_list.append(reports)
+        datasets_list.append(datasets)
+        users_list.append(users)
+    return (pd.concat(reports_list, ignore_index=True), pd.concat(datasets_list, ignore_index=True),
+            pd.concat(users_list, ignore_index=True))
+
+
+def ingest_csv(path, store_dir):
+    from activity_store import ActivityStore, read_activity_chunks
+
+    store = ActivityStore.ingest("bench", read_activity_chunks(path), root=store_dir)
+    return store.rollup(), store.top_summary(), store.user_sketch(), store.last_seen()
+
+
+def activity_status(activity_df, reports_df, datasets_df, users_df):
+    from utils import apply_activity_status
+
+    return apply_activity_status(activity_df, reports_df, datasets_df, users_df)
+
+
+def status_windows(activity_df, reports_df, datasets_df, users_df, last_seen):
+    from last_seen import ACTIVITY_WINDOWS
+    from utils import apply_activity_status
+
+    return [
+        apply_activity_status(activity_df, reports_df.copy(deep=False), datasets_df.copy(deep=False),
+                              users_df.copy(deep=False), window=days, last_seen=last_seen)
+        for days in ACTIVITY_WINDOWS.values()
+    ]
+
+
+def status_summaries(reports_df, datasets_df):
+    from utils import summarize_names
+
+    return (summarize_names(reports_df, ["workspace_name", "Reportstatus Based on Dataset"]),
+            summarize_names(datasets_df, ["workspace_name", "Dataset Freshness Status"]))
+
+
+def top_engagement(engine, reports_df, datasets_df):
+    from last_seen import window_start
+
+    cutoff = window_start()
+    return (engine.top_artifacts_by_id(reports_df["id"], 5), engine.top_artifacts_by_id(datasets_df["id"], 5),
+            engine.top_users(5), engine.top_users(5, since=cutoff))
+
+
+def usage_trends(engine):
+    return engine.top_artifacts(10), engine.users_per_domain(), engine.weekday_counts(), engine.monthly_counts()
+
+
+def access_heatmap(engine):
+    return engine.access_matrix()
+
+
+def unused_artifacts(activity_df, reports_df, datasets_df):
+    from utils import find_unused_artifacts
+
+    return find_unused_artifacts(activity_df, reports_df, datasets_df)
+
+
+def run_benchmark(workspaces, artifacts, events, seed=0, track_memory=True, tenant_dir=None, engine=None):
+    from activity_engine import ActivityEngine, ACTIVITY_ENGINE
+    from heavy_hitters import HeavyHitters
+    from distinct_users import DistinctUsers
+    from last_seen import LastSeen
+
+    recorder = StageRecorder(track_memory)
+    with tempfile.TemporaryDirectory() as tmp:
+        if tenant_dir is None:
+            tenant_dir = tmp
+            recorder.run("generate_tenant", write_tenant, tenant_dir,
+                         workspaces=workspaces, artifacts=artifacts, events=events, seed=seed)
+        tenant, workspace_list = load_tenant(tenant_dir)
+        install_fixture_api(tenant, workspace_list)
+
+        reports_df, datasets_df, users_df = recorder.run("fetch_inventory", fetch_inventory, workspace_list)
+        activity_df, top_summary, user_sketch, stored_last_seen = recorder.run(
+            "csv_ingest", ingest_csv, os.path.join(tenant_dir, "activity.csv"), os.path.join(tmp, "store")
+        )
+
+    activity_df, reports_df, datasets_df, users_df, _ = recorder.run(
+        "apply_activity_status", activity_status, activity_df, reports_df, datasets_df, users_df
+    )
+    recorder.run("last_seen_scan", LastSeen, activity_df)
+    # Windows are answered from the last-seen tables kept by the store
+    recorder.run("status_windows", status_windows, activity_df, reports_df, datasets_df, users_df, stored_last_seen)
+    recorder.run("status_summaries", status_summaries, reports_df, datasets_df)
+    activity = recorder.run("activity_engine", ActivityEngine, activity_df, engine or ACTIVITY_ENGINE)
+    recorder.run("top_engagement", top_engagement, activity, reports_df, datasets_df)
+    hitters = recorder.run("heavy_hitters", HeavyHitters, top_summary)
+    recorder.run("top_engagement_topk", top_engagement,
+                 ActivityEngine(activity_df, engine or ACTIVITY_ENGINE, hitters=hitters), reports_df, datasets_df)
+    recorder.run("usage_trends", usage_trends, activity)
+    distinct = recorder.run("distinct_users", DistinctUsers, user_sketch)
+    recorder.run("users_per_domain_hll", distinct.users_per_domain, pd.concat([reports_df["id"], datasets_df["id"]]))
+    if activity_df["User email"].nunique() * activity_df["Artifact Name"].nunique() <= HEATMAP_CELL_LIMIT:
+        recorder.run("access_heatmap", access_heatmap, activity)
+    recorder.run("unused_artifacts", unused_artifacts, activity_df, reports_df, datasets_df)
+    return recorder.results
+
+
+def find_regressions(results, baseline, tolerance, min_seconds=0.05):
+    previous = {r["stage"]: r["seconds"] for r in baseline}
+    regressions = []
+    for r in results:
+        before = previous.get(r["stage"])
+        if before is not None and r["seconds"] > max(before * (1 + tolerance), min_seconds):
+            regressions.append((r["stage"], before, r["seconds"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the governance data pipeline.")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--workspaces", type=int, help="override the preset workspace count")
+    parser.add_argument("--artifacts", type=int, help="override the preset artifact count")
+    parser.add_argument("--events", type=int, help="override the preset activity event count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tenant", help="benchmark a tenant written by synthetic_tenant.py instead of generating one")
+    parser.add_argument("--engine", choices=["duckdb", "pandas"], help="activity engine (default: duckdb when installed)")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, timings only)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    size = dict(SCALES[args.scale])
+    for key in size:
+        if getattr(args, key) is not None:
+            size[key] = getattr(args, key)
+
+    if args.tenant:
+        print(f"Tenant: {args.tenant}")
+    else:
+        print(f"Tenant: {size['workspaces']:,} workspaces, {size['artifacts']:,} artifacts, {size['events']:,} events")
+    results = run_benchmark(size["workspaces"], size["artifacts"], size["events"], args.seed,
+                            not args.no_memory, args.tenant, args.engine)
+
+    print(f"{'stage':<24} {'seconds':>10} {'peak MB':>10}")
+    for r in results:
+        peak = f"{r['peak_mb']:.1f}" if r["peak_mb"] is not None else "-"
+        print(f"{r['stage']:<24} {r['seconds']:>10.3f} {peak:>10}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"size": size, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for stage, before, after in regressions:
+            print(f"REGRESSION {stage}: {before:.3f}s -> {after:.3f}s")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Serve the bundled data/*.json fixtures in place of the Power BI REST API."""
+import json
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "App")
+DATA_DIR = os.path.join(ROOT, "data")
+SAMPLE_ACTIVITY_CSV = os.path.join(APP_DIR, "sample_analysis", "data.csv")
+FIXTURES = {"reports": "reports.json", "datasets": "datasets.json", "users": "user.json"}
+WORKSPACE_ID = "d459e975-fd2e-4db5-a602-03f515215de2"
+WORKSPACE_NAME = "Fixture Workspace"
+
+
+class FixtureResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+        self.headers = {}
+
+    def json(self):
+        return self.payload
+
+
+def load_fixture(name):
+    with open(os.path.join(DATA_DIR, FIXTURES[name])) as f:
+        return json.load(f)
+
+
+# Answers every workspace with the same fixture payloads, or with the
+# per-workspace payloads in `tenant` ({workspace_id: {"reports": ..., ...}})
+def make_fixture_get(tenant=None, workspaces=None):
+    cache = {}
+
+    def fixture_get(url, headers=None, **kwargs):
+        parts = url.rstrip("/").split("/")
+        resource = parts[-1]
+        if resource == "groups":
+            return FixtureResponse({"value": workspaces or [{"id": WORKSPACE_ID, "name": WORKSPACE_NAME}]})
+        if resource not in FIXTURES:
+            return FixtureResponse({"error": "not found"}, 404)
+        if tenant is not None:
+            payload = tenant.get(parts[-2], {}).get(resource)
+            return FixtureResponse(payload) if payload is not None else FixtureResponse({"error": "not found"}, 404)
+        if resource not in cache:
+            cache[resource] = load_fixture(resource)
+        return FixtureResponse(cache[resource])
+
+    return fixture_get
+
+
+def install_fixture_api(tenant=None, workspaces=None):
+    import requests
+
+    requests.get = make_fixture_get(tenant, workspaces)
+
+
+def sample_activity():
+    import pandas as pd
+
+    df = pd.read_csv(SAMPLE_ACTIVITY_CSV, encoding="utf-8-sig")
+    df["Activity time"] = pd.to_datetime(df["Activity time"], errors="coerce")
+    # Point the sample events at the fixture artifacts so activity pages have data to show
+    fixture_ids = [a["id"] for name in ("reports", "datasets") for a in load_fixture(name)["value"]]
+    artifact_ids = df["ArtifactId"].unique()
+    df["ArtifactId"] = df["ArtifactId"].map(
+        {a: fixture_ids[i % len(fixture_ids)] for i, a in enumerate(artifact_ids)}
+    )
+    return df
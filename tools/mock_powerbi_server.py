@@ -0,0 +1,183 @@
+"""Local stand-in for the Power BI REST API.
+
+Serves the data/*.json fixtures (one workspace) or a tenant written by
+synthetic_tenant.py under the same paths as the real service:
+
+    GET /v1.0/myorg/groups
+    GET /v1.0/myorg/groups/<workspace id>/reports | datasets | users
+
+Latency, throttling (429 with Retry-After) and pagination
+(@odata.nextLink, $top/$skip) can be injected to load-test fetch
+concurrency and retries offline. Any bearer token is accepted.
+
+    python tools/mock_powerbi_server.py --tenant out/tenant --latency-ms 200 --rate-limit 20 --page-size 100
+    cd App && POWERBI_API_BASE=http://127.0.0.1:8787/v1.0/myorg streamlit run streamlit_app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from fixtures import FIXTURES, WORKSPACE_ID, WORKSPACE_NAME, load_fixture
+from synthetic_tenant import load_tenant
+
+API_PREFIX = "/v1.0/myorg"
+
+
+# Token bucket shared by all connections: rate_limit requests per second
+# with bursts of up to `burst` requests
+class Throttle:
+    def __init__(self, rate_limit, burst):
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Return 0 if the request may proceed, else the seconds to wait."""
+        if not self.rate_limit:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate_limit)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate_limit
+
+
+class MockPowerBIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, tenant, workspaces, latency_ms=0, jitter_ms=0,
+                 rate_limit=0, burst=10, page_size=0, error_rate=0.0):
+        super().__init__(address, MockPowerBIHandler)
+        self.tenant = tenant
+        self.workspaces = workspaces
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle = Throttle(rate_limit, burst)
+        self.page_size = page_size
+        self.error_rate = error_rate
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, name):
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+
+class MockPowerBIHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.count("requests")
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self.send_json(401, {"error": {"code": "TokenNotProvided"}})
+
+        wait = server.throttle.acquire()
+        if wait:
+            server.count("throttled")
+            return self.send_json(429, {"error": {"code": "TooManyRequests"}}, {"Retry-After": str(max(1, round(wait)))})
+        if server.error_rate and random.random() < server.error_rate:
+            server.count("errors")
+            return self.send_json(503, {"error": {"code": "ServiceUnavailable"}}, {"Retry-After": "1"})
+        if server.latency_ms or server.jitter_ms:
+            time.sleep((server.latency_ms + random.uniform(0, server.jitter_ms)) / 1000)
+
+        url = urlsplit(self.path)
+        payload = self.lookup(url.path)
+        if payload is None:
+            return self.send_json(404, {"error": {"code": "ItemNotFound", "message": url.path}})
+        self.send_json(200, self.paginate(url, payload))
+
+    def lookup(self, path):
+        if not path.startswith(API_PREFIX):
+            return None
+        parts = path[len(API_PREFIX):].strip("/").split("/")
+        if parts == ["groups"]:
+            return {"@odata.context": f"{self.server.base_url()}/$metadata#groups", "value": self.server.workspaces}
+        if len(parts) == 3 and parts[0] == "groups" and parts[2] in FIXTURES:
+            return self.server.tenant.get(parts[1], {}).get(parts[2])
+        return None
+
+    def paginate(self, url, payload):
+        query = parse_qs(url.query)
+        values = payload.get("value", [])
+        skip = int(query.get("$skip", ["0"])[0])
+        top = int(query.get("$top", [str(self.server.page_size or len(values))])[0])
+        if self.server.page_size:
+            top = min(top, self.server.page_size)
+        page = dict(payload, value=values[skip:skip + top])
+        # Server-driven paging: only the configured page size produces a nextLink
+        if self.server.page_size and skip + top < len(values):
+            next_query = dict({k: v[0] for k, v in query.items()}, **{"$skip": skip + top})
+            host, port = self.server.server_address[:2]
+            page["@odata.nextLink"] = f"http://{host}:{port}{url.path}?{urlencode(next_query)}"
+        return page
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def fixture_tenant():
+    workspaces = [{"id": WORKSPACE_ID, "name": WORKSPACE_NAME, "isReadOnly": False, "isOnDedicatedCapacity": False}]
+    return {WORKSPACE_ID: {name: load_fixture(name) for name in FIXTURES}}, workspaces
+
+
+def start_server(host="127.0.0.1", port=8787, tenant_dir=None, **options):
+    """Start the server on a background thread and return it (port 0 picks a free port)."""
+    tenant, workspaces = load_tenant(tenant_dir) if tenant_dir else fixture_tenant()
+    server = MockPowerBIServer((host, port), tenant, workspaces, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Power BI REST API for offline development and load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--tenant", help="serve a tenant written by synthetic_tenant.py instead of data/*.json")
+    parser.add_argument("--latency-ms", type=float, default=0, help="fixed delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="random extra delay, up to this much")
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests per second before answering 429 (0 = off)")
+    parser.add_argument("--burst", type=int, default=10, help="requests allowed in a burst above the rate limit")
+    parser.add_argument("--page-size", type=int, default=0, help="items per page, with @odata.nextLink (0 = no paging)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    args = parser.parse_args()
+
+    server = start_server(
+        args.host, args.port, args.tenant, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit, burst=args.burst, page_size=args.page_size, error_rate=args.error_rate,
+    )
+    print(f"Mock Power BI API: {server.base_url()} ({len(server.workspaces):,} workspaces)")
+    print(f"Run the app with POWERBI_API_BASE={server.base_url()}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"Served {server.stats['requests']:,} requests, "
+              f"{server.stats['throttled']:,} throttled, {server.stats['errors']:,} errors")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
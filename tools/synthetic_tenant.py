@@ -0,0 +1,218 @@
+"""Generate a synthetic Power BI tenant for load and scale testing.
+
+The output mirrors what the app consumes:
+
+    <out>/groups.json                       workspace list (GET /groups)
+    <out>/workspaces/<id>/reports.json      same shape as data/reports.json
+    <out>/workspaces/<id>/datasets.json     same shape as data/datasets.json
+    <out>/workspaces/<id>/users.json        same shape as data/user.json
+    <out>/activity.csv                      same header as App/sample_analysis/data.csv
+
+Workspaces and activity events are streamed to disk, so memory stays flat
+however many events are requested. Popularity is Zipf-skewed (hot
+artifacts and heavy users), one email domain can dominate, and a share of
+users is dormant (no events in the last --dormant-days).
+
+    python tools/synthetic_tenant.py out/tenant --workspaces 1000 --artifacts 10000 --events 1000000
+"""
+import argparse
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from fixtures import load_fixture
+
+ACTIVITY_COLUMNS = ["Activity time", "User email", "Activity", "ArtifactId", "Artifact Name"]
+ACTIVITY_WEIGHTS = {"ViewReport": 0.7, "ViewDataset": 0.1, "ExportReport": 0.1, "EditReport": 0.07, "ShareReport": 0.03}
+DOMAINS = ["dovercorp.com", "opco-one.com", "opco-two.com", "opco-three.com", "opco-four.com"]
+ACCESS_RIGHTS = ["Admin", "Member", "Contributor", "Viewer"]
+ODATA_CONTEXT = "https://api.powerbi.com/v1.0/myorg/groups/{}/$metadata#{}"
+
+
+def zipf_weights(n, skew, rng):
+    if skew <= 0:
+        return np.full(n, 1.0 / n)
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    # Shuffle ranks so hot items are not simply the first ones generated
+    weights = weights[rng.permutation(n)]
+    return weights / weights.sum()
+
+
+def domain_weights(dominant_share):
+    rest = (1 - dominant_share) / (len(DOMAINS) - 1)
+    return np.array([dominant_share] + [rest] * (len(DOMAINS) - 1))
+
+
+def build_user_pool(users, dominant_share, rng):
+    domains = rng.choice(DOMAINS, size=users, p=domain_weights(dominant_share))
+    return np.array([f"user{i}@{d}" for i, d in enumerate(domains)], dtype=object)
+
+
+def iter_workspaces(workspaces, artifacts, user_pool, seed=0, now=None):
+    """Yield (workspace, {"reports": ..., "datasets": ..., "users": ...}) one workspace at a time."""
+    rng = np.random.default_rng(seed)
+    now = now or pd.Timestamp.now().normalize()
+    report_template = load_fixture("reports")["value"][0]
+    dataset_template = load_fixture("datasets")["value"][0]
+    user_template = load_fixture("users")["value"][0]
+    # Workspace sizes are skewed too: a few large workspaces, many small ones
+    sizes = np.maximum(1, np.round(zipf_weights(workspaces, 0.8, rng) * artifacts / 2)).astype(int)
+
+    for w in range(workspaces):
+        ws_id = str(uuid.UUID(int=int(rng.integers(2**62)) << 64 | w))
+        workspace = {"id": ws_id, "name": f"Workspace {w:05d}", "isReadOnly": False, "isOnDedicatedCapacity": False}
+        datasets, reports = [], []
+        for i in range(sizes[w]):
+            created = now - pd.Timedelta(days=int(rng.integers(0, 3 * 365)), seconds=int(rng.integers(0, 86400)))
+            dataset_id, report_id = str(uuid.uuid4()), str(uuid.uuid4())
+            datasets.append(dict(
+                dataset_template, id=dataset_id, name=f"Dataset {w:05d}-{i}",
+                webUrl=f"https://app.powerbi.com/groups/{ws_id}/datasets/{dataset_id}",
+                configuredBy=str(rng.choice(user_pool)), isRefreshable=bool(rng.random() < 0.7),
+                createdDate=created.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            ))
+            reports.append(dict(
+                report_template, id=report_id, name=f"Report {w:05d}-{i}", datasetId=dataset_id,
+                webUrl=f"https://app.powerbi.com/groups/{ws_id}/reports/{report_id}",
+            ))
+        members = rng.choice(len(user_pool), size=min(len(user_pool), int(rng.integers(3, 25))), replace=False)
+        users = [dict(
+            user_template, emailAddress=user_pool[u], identifier=user_pool[u],
+            displayName=user_pool[u].split("@")[0].title(), groupUserAccessRight=str(rng.choice(ACCESS_RIGHTS)),
+        ) for u in members]
+        yield workspace, {
+            "reports": {"@odata.context": ODATA_CONTEXT.format(ws_id, "reports"), "value": reports},
+            "datasets": {"@odata.context": ODATA_CONTEXT.format(ws_id, "datasets"), "value": datasets},
+            "users": {"@odata.context": ODATA_CONTEXT.format(ws_id, "users"), "value": users},
+        }
+
+
+def iter_activity_chunks(artifact_ids, artifact_names, user_pool, events, chunk_size=1_000_000,
+                         artifact_skew=1.1, user_skew=1.0, dormant_share=0.3, dormant_days=180,
+                         days=365, seed=0, now=None):
+    """Yield activity DataFrames of at most chunk_size rows, each sorted by time."""
+    rng = np.random.default_rng(seed + 1)
+    now = now or pd.Timestamp.now().normalize()
+    artifact_p = zipf_weights(len(artifact_ids), artifact_skew, rng)
+    user_p = zipf_weights(len(user_pool), user_skew, rng)
+    dormant = rng.random(len(user_pool)) < dormant_share
+    activities = np.array(list(ACTIVITY_WEIGHTS), dtype=object)
+    activity_p = np.array(list(ACTIVITY_WEIGHTS.values()))
+    window = days * 86400
+    dormant_window = max(0, days - dormant_days) * 86400
+
+    # Each chunk covers the next slice of the time window, oldest first
+    chunks = max(1, -(-events // chunk_size))
+    for c in range(chunks):
+        n = min(chunk_size, events - c * chunk_size)
+        slot_start = window * c // chunks
+        slot_end = window * (c + 1) // chunks
+        users = rng.choice(len(user_pool), size=n, p=user_p)
+        picks = rng.choice(len(artifact_ids), size=n, p=artifact_p)
+        age = window - rng.integers(slot_start, max(slot_end, slot_start + 1), size=n)
+        # Dormant users only have events older than dormant_days
+        is_dormant = dormant[users]
+        if dormant_window:
+            age[is_dormant] = window - rng.integers(0, dormant_window, size=is_dormant.sum())
+        chunk = pd.DataFrame({
+            "Activity time": now - pd.to_timedelta(age, unit="s"),
+            "User email": user_pool[users],
+            "Activity": rng.choice(activities, size=n, p=activity_p),
+            "ArtifactId": artifact_ids[picks],
+            "Artifact Name": artifact_names[picks],
+        }, columns=ACTIVITY_COLUMNS)
+        yield chunk.sort_values("Activity time", kind="stable")
+
+
+def generate_tenant(workspaces, artifacts, events, users=None, seed=0, dominant_share=0.6,
+                    artifact_skew=1.1, user_skew=1.0, dormant_share=0.3, dormant_days=180, days=365,
+                    chunk_size=1_000_000, on_workspace=None, on_chunk=None):
+    """Drive the generators and hand each workspace and event chunk to the callbacks."""
+    rng = np.random.default_rng(seed)
+    user_pool = build_user_pool(users or max(50, artifacts // 10), dominant_share, rng)
+    artifact_ids, artifact_names, workspace_list = [], [], []
+    for workspace, payloads in iter_workspaces(workspaces, artifacts, user_pool, seed):
+        workspace_list.append(workspace)
+        for kind in ("reports", "datasets"):
+            for artifact in payloads[kind]["value"]:
+                artifact_ids.append(artifact["id"])
+                artifact_names.append(artifact["name"])
+        if on_workspace:
+            on_workspace(workspace, payloads)
+    for chunk in iter_activity_chunks(
+        np.array(artifact_ids, dtype=object), np.array(artifact_names, dtype=object), user_pool, events,
+        chunk_size, artifact_skew, user_skew, dormant_share, dormant_days, days, seed,
+    ):
+        if on_chunk:
+            on_chunk(chunk)
+    return workspace_list
+
+
+def write_tenant(out_dir, **options):
+    os.makedirs(os.path.join(out_dir, "workspaces"), exist_ok=True)
+    activity_path = os.path.join(out_dir, "activity.csv")
+    if os.path.exists(activity_path):
+        os.remove(activity_path)
+
+    def save_workspace(workspace, payloads):
+        ws_dir = os.path.join(out_dir, "workspaces", workspace["id"])
+        os.makedirs(ws_dir, exist_ok=True)
+        for kind, payload in payloads.items():
+            with open(os.path.join(ws_dir, f"{kind}.json"), "w") as f:
+                json.dump(payload, f)
+
+    def save_chunk(chunk):
+        header = not os.path.exists(activity_path)
+        chunk.to_csv(activity_path, mode="a", header=header, index=False, date_format="%Y-%m-%d %H:%M:%S")
+
+    workspace_list = generate_tenant(on_workspace=save_workspace, on_chunk=save_chunk, **options)
+    with open(os.path.join(out_dir, "groups.json"), "w") as f:
+        json.dump({"@odata.context": "https://api.powerbi.com/v1.0/myorg/$metadata#groups", "value": workspace_list}, f)
+    return workspace_list
+
+
+def load_tenant(out_dir):
+    """Read a generated tenant back as ({workspace_id: payloads}, workspace list)."""
+    with open(os.path.join(out_dir, "groups.json")) as f:
+        workspace_list = json.load(f)["value"]
+    tenant = {}
+    for workspace in workspace_list:
+        ws_dir = os.path.join(out_dir, "workspaces", workspace["id"])
+        tenant[workspace["id"]] = {}
+        for kind in ("reports", "datasets", "users"):
+            with open(os.path.join(ws_dir, f"{kind}.json")) as f:
+                tenant[workspace["id"]][kind] = json.load(f)
+    return tenant, workspace_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Power BI tenant.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--workspaces", type=int, default=100)
+    parser.add_argument("--artifacts", type=int, default=2_000, help="reports + datasets across the tenant")
+    parser.add_argument("--users", type=int, help="distinct users (default: artifacts / 10, at least 50)")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365, help="time span of the activity log")
+    parser.add_argument("--artifact-skew", type=float, default=1.1, help="Zipf exponent of artifact popularity, 0 = uniform")
+    parser.add_argument("--user-skew", type=float, default=1.0, help="Zipf exponent of user activity, 0 = uniform")
+    parser.add_argument("--dominant-domain-share", type=float, default=0.6, help="share of users in the main email domain")
+    parser.add_argument("--dormant-share", type=float, default=0.3, help="share of users without recent activity")
+    parser.add_argument("--dormant-days", type=int, default=180)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="events generated and written per chunk")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workspace_list = write_tenant(
+        args.out_dir, workspaces=args.workspaces, artifacts=args.artifacts, events=args.events,
+        users=args.users, seed=args.seed, dominant_share=args.dominant_domain_share,
+        artifact_skew=args.artifact_skew, user_skew=args.user_skew, dormant_share=args.dormant_share,
+        dormant_days=args.dormant_days, days=args.days, chunk_size=args.chunk_size,
+    )
+    print(f"Wrote {len(workspace_list):,} workspaces and {args.events:,} events to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()